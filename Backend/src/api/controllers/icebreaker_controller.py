@@ -1,34 +1,67 @@
 import os
 import re
+import logging
+import asyncio
 import json
 import uuid
-from io import BytesIO
-from typing import Any, List
+import hashlib
+import mmap
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Any, BinaryIO, Dict, Iterator, List, Optional, Tuple
 
-import openai
 from fastapi import HTTPException, UploadFile, File, Form, Request, BackgroundTasks
-from pypdf import PdfReader
+from fastapi.responses import StreamingResponse
+from starlette.concurrency import run_in_threadpool
+
+# orjson parses straight from bytes and is much faster than stdlib json; optional.
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fall back to stdlib json
+    orjson = None  # type: ignore
 
 from src.services.qstash_client import (
     get_qstash_client,
     qstash_publish_json,
     verify_qstash_request,
+    decode_qstash_body,
     build_callback_url,
     is_loopback_or_private,
 )
 from src.services.supabase_logger import (
-    log_interaction,
+    enqueue_interaction,
     fetch_interactions,
+    fetch_interactions_multi,
+    decode_cursor,
+    next_cursor,
+    FEED_COLUMNS,
     delete_interaction_by_id,
+    fetch_pdf_cache,
+    upsert_pdf_cache,
 )
-from src.services.tasks import process_icebreaker as process_icebreaker_task
-
-
-def _groq_client():
-    return openai.OpenAI(
-        base_url="https://api.groq.com/openai/v1",
-        api_key=os.getenv("GROQ_API_KEY"),
-    )
+from src.services.tasks import process_icebreaker as process_icebreaker_task, enqueue_batch_job
+from src.services.groq_client import GROQ_MODEL, get_async_groq_client
+from src.services import llm_cache, list_cache, supabase_logger
+
+logger = logging.getLogger(__name__)
+
+# Decks whose extracted text fits under this many characters are sent to the
+# icebreaker prompt as-is; longer decks are summarized first.
+DECK_INLINE_MAX_CHARS = 6000
+# Summarization input is bounded: ~6k tokens (at ~4 chars/token) per call, a fixed
+# number of chunks per deck, and a hard output cap per summary.
+DECK_SUMMARY_CHUNK_CHARS = 24000
+DECK_SUMMARY_MAX_CHUNKS = 8
+DECK_SUMMARY_MAX_TOKENS = 500
+# Read size when hashing uploads for the PDF cache
+PDF_HASH_CHUNK_BYTES = 1024 * 1024
+# Uploads larger than this are rejected with 413 before any hashing or parsing
+MAX_PDF_BYTES = int(os.getenv("MAX_PDF_BYTES", str(20 * 1024 * 1024)))
+
+# Post-processing patterns for LLM output, compiled once at import.
+# Whitespace runs are collapsed with " ".join(text.split()), which is several times faster than a regex.
+_GREETING_RE = re.compile(r"^(dear|hi|hello)\b[^,]*,?\s*", re.IGNORECASE)
+_BRACKET_RE = re.compile(r"\[[^\]]+\]")
 
 
 def _extract_choice_content(completion: Any) -> str:
@@ -57,26 +90,46 @@ def _extract_choice_content(completion: Any) -> str:
         raise HTTPException(status_code=500, detail=f"Unexpected Groq response shape: {e}")
 
 
-def _extract_pdf_text(pdf_bytes: bytes) -> str:
-    if PdfReader is None:
+@lru_cache(maxsize=1)
+def _pdf_libs() -> Tuple[Any, Any]:
+    """Import the PDF parsers on first use (not at startup) and return (fitz, PdfReader).
+
+    Prefers PyMuPDF (C-backed, much faster); pypdf is only imported if the PyMuPDF
+    wheel is missing. Either entry is None when its library is not installed.
+    """
+    try:
+        import pymupdf as fitz  # type: ignore
+        return fitz, None
+    except Exception:  # pragma: no cover - tolerate missing wheel
+        pass
+    try:
+        import fitz  # type: ignore
+        return fitz, None
+    except Exception:  # pragma: no cover
+        pass
+    try:
+        from pypdf import PdfReader  # type: ignore
+        return None, PdfReader
+    except Exception:  # pragma: no cover
+        return None, None
+
+
+def _extract_pdf_text(pdf_file: BinaryIO) -> str:
+    fitz, PdfReader = _pdf_libs()
+    if fitz is not None:
+        stripped_texts = _extract_pages_with_fitz(pdf_file, fitz)
+    elif PdfReader is not None:
+        stripped_texts = _extract_pages_with_pypdf(pdf_file, PdfReader)
+    else:
         raise HTTPException(
             status_code=500,
-            detail=("PDF parsing library missing. Install pypdf: pip install pypdf"),
+            detail=("PDF parsing library missing. Install PyMuPDF: pip install pymupdf"),
         )
-    try:
-        reader = PdfReader(BytesIO(pdf_bytes))
-    except Exception as e:
-        raise HTTPException(status_code=400, detail=f"Invalid PDF file: {e}")
 
-    pages_text: List[str] = []
-    for i, page in enumerate(reader.pages):
-        try:
-            text = page.extract_text() or ""
-        except Exception:
-            text = ""
-        header = f"--- Slide {i+1} ---\n" if text.strip() else ""
-        pages_text.append(f"{header}{text.strip()}")
-    combined = "\n\n".join([t for t in pages_text if t])
+    # Single pass: frame non-empty pages and join without an intermediate filtered list
+    combined = "\n\n".join(
+        f"--- Slide {i+1} ---\n{t}" for i, t in enumerate(stripped_texts) if t
+    )
     if not combined:
         raise HTTPException(
             status_code=422,
@@ -88,7 +141,159 @@ def _extract_pdf_text(pdf_bytes: bytes) -> str:
     return combined
 
 
-def _summarize_deck_with_groq(client: Any, raw_text: str) -> str:
+@contextmanager
+def _pdf_bytes(pdf_file: BinaryIO) -> Iterator[Any]:
+    """Yield the upload's bytes for fitz.open(stream=...), without copying them where possible.
+
+    Uploads Starlette has rolled to a temp file (over its 1 MB threshold) are memory-mapped,
+    and a BytesIO is viewed through getbuffer(). Only in-memory spools, which are at most
+    that 1 MB, are read into a bytes object.
+    """
+    if hasattr(pdf_file, "getbuffer"):
+        with pdf_file.getbuffer() as view:
+            yield view
+        return
+    # An in-memory SpooledTemporaryFile has no name; one rolled to disk is named by its fd
+    if getattr(pdf_file, "name", None) is not None:
+        try:
+            pdf_file.flush()
+            mapped = mmap.mmap(pdf_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (AttributeError, OSError, ValueError):  # no fd, or an empty file
+            mapped = None
+        if mapped is not None:
+            with mapped, memoryview(mapped) as view:
+                yield view
+            return
+    pdf_file.seek(0)
+    yield pdf_file.read()
+
+
+def _extract_pages_with_fitz(pdf_file: BinaryIO, fitz: Any) -> List[str]:
+    with _pdf_bytes(pdf_file) as data:
+        try:
+            doc = fitz.open(stream=data, filetype="pdf")
+        except Exception as e:
+            raise HTTPException(status_code=400, detail=f"Invalid PDF file: {e}")
+
+        # Text-only flags: image blocks and vector drawings are never collected. Resolved once,
+        # outside the loop, so a build without the constant falls back to default extraction.
+        flags = getattr(fitz, "TEXTFLAGS_TEXT", 0)
+        # A damaged page yields no text; anything else (e.g. a bug in this code) still raises
+        mupdf_error = getattr(getattr(fitz, "mupdf", None), "FzErrorBase", RuntimeError)
+        page_errors = (RuntimeError, ValueError, mupdf_error)
+
+        stripped_texts: List[str] = []
+        # Closed before the mapping/view it reads from is released
+        with doc:
+            for page in doc:
+                try:
+                    text = page.get_text("text", flags=flags) or ""
+                except page_errors:
+                    text = ""
+                stripped_texts.append(text.strip())
+    return stripped_texts
+
+
+def _extract_pages_with_pypdf(pdf_file: BinaryIO, PdfReader: Any) -> List[str]:
+    try:
+        pdf_file.seek(0)
+        reader = PdfReader(pdf_file)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Invalid PDF file: {e}")
+
+    stripped_texts: List[str] = []
+    for page in reader.pages:
+        try:
+            text = page.extract_text() or ""
+        except Exception:
+            text = ""
+        stripped_texts.append(text.strip())
+    return stripped_texts
+
+
+async def _cached_completion(
+    client: Any,
+    messages: List[dict],
+    temperature: float,
+    max_tokens: Optional[int] = None,
+) -> Tuple[str, bool]:
+    """Completion text and whether it was reused from the cache (see llm_cache.get_or_compute)."""
+    model = GROQ_MODEL
+    key = llm_cache.make_cache_key(model, messages, temperature, max_tokens)
+
+    async def _complete() -> str:
+        params: dict = {"messages": messages, "model": model, "temperature": temperature}
+        if max_tokens is not None:
+            params["max_tokens"] = max_tokens
+        completion = await client.chat.completions.create(**params)
+        return _extract_choice_content(completion)
+
+    # Cache hit, or join an identical request already in flight, or call Groq
+    return await llm_cache.get_or_compute(key, _complete)
+
+
+def _has_pdf_header(pdf_file: BinaryIO) -> bool:
+    """Check for the %PDF- marker (allowed anywhere in the first 1024 bytes per the spec)."""
+    pdf_file.seek(0)
+    head = pdf_file.read(1024)
+    pdf_file.seek(0)
+    return b"%PDF-" in head
+
+
+def _hash_pdf(pdf_file: BinaryIO) -> Tuple[str, int]:
+    """MD5 and byte size of the upload, read in chunks; leaves the file positioned at the start.
+
+    Raises 413 as soon as more than MAX_PDF_BYTES have been read, so uploads whose size
+    wasn't declared (chunked bodies, UploadFile.size is None) are capped too.
+    """
+    digest = hashlib.md5()
+    bytes_read = 0
+    pdf_file.seek(0)
+    for chunk in iter(lambda: pdf_file.read(PDF_HASH_CHUNK_BYTES), b""):
+        bytes_read += len(chunk)
+        if bytes_read > MAX_PDF_BYTES:
+            raise HTTPException(status_code=413, detail=f"pitchDeck exceeds the {MAX_PDF_BYTES}-byte limit")
+        digest.update(chunk)
+    pdf_file.seek(0)
+    return digest.hexdigest(), bytes_read
+
+
+def _chunk_deck_text(raw_text: str, max_chars: int) -> List[str]:
+    """Split deck text into chunks of at most max_chars, preferring slide boundaries."""
+    chunks: List[str] = []
+    current = ""
+    for slide in raw_text.split("\n\n"):
+        while len(slide) > max_chars:
+            if current:
+                chunks.append(current)
+                current = ""
+            chunks.append(slide[:max_chars])
+            slide = slide[max_chars:]
+        if current and len(current) + 2 + len(slide) > max_chars:
+            chunks.append(current)
+            current = slide
+        else:
+            current = f"{current}\n\n{slide}" if current else slide
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+async def _summarize_deck_with_groq(client: Any, raw_text: str) -> str:
+    # Long decks are map-reduced: chunk summaries run concurrently, then get merged.
+    # This bounds prompt size (and therefore latency/cost) regardless of deck length.
+    if len(raw_text) > DECK_SUMMARY_CHUNK_CHARS:
+        chunks = _chunk_deck_text(raw_text, DECK_SUMMARY_CHUNK_CHARS)
+        if len(chunks) > DECK_SUMMARY_MAX_CHUNKS:
+            # Keep the opening slides and the closing slide(s); the middle is usually detail
+            chunks = chunks[: DECK_SUMMARY_MAX_CHUNKS - 1] + chunks[-1:]
+        partials = await asyncio.gather(*(_summarize_deck_chunk(client, c) for c in chunks))
+        raw_text = "\n\n".join(partials)
+
+    return await _summarize_deck_chunk(client, raw_text)
+
+
+async def _summarize_deck_chunk(client: Any, raw_text: str) -> str:
     prompt = (
         "You are analyzing a pitch deck. Read the full extracted text and "
         "produce a concise executive summary capturing: product, ICP, pain points, "
@@ -96,29 +301,69 @@ def _summarize_deck_with_groq(client: Any, raw_text: str) -> str:
         "Keep it under 300-400 words and avoid speculation.\n\n"
         "Deck Text:\n" + raw_text
     )
-    final = client.chat.completions.create(
+    summary, _ = await _cached_completion(
+        client,
         messages=[
             {"role": "system", "content": "You write concise executive summaries."},
             {"role": "user", "content": prompt},
         ],
-        model=os.getenv("GROQ_MODEL", "allam-2-7b"),
         temperature=0.2,
+        max_tokens=DECK_SUMMARY_MAX_TOKENS,
     )
-    summary = _extract_choice_content(final)
-    summary = re.sub(r"\s+", " ", summary).strip()
+    summary = " ".join(summary.split())
     return summary
 
 
-async def generate_icebreaker_from_pdf_controller(
+async def _prepare_pdf_icebreaker(
     linkedinBio: str,
     pitchDeck: UploadFile,
-):
+    background_tasks: BackgroundTasks,
+) -> Tuple[List[dict], Dict[str, Any]]:
+    """Validate and read the deck, then build the icebreaker chat messages.
+
+    Returns (messages, log_input): the messages for the icebreaker completion and the
+    input payload to record with the interaction log.
+    """
     if pitchDeck.content_type not in ("application/pdf", "application/octet-stream"):
         raise HTTPException(status_code=400, detail="Only PDF files are supported for pitchDeck")
 
-    pdf_bytes = await pitchDeck.read()
-    extracted_text = _extract_pdf_text(pdf_bytes)
-    deck_summary = _summarize_deck_with_groq(_groq_client(), extracted_text)
+    # Parse straight from the spooled upload: Starlette streams bodies over 1 MB to a temp
+    # file, which PyMuPDF reads through a memory map rather than a read() copy (_pdf_bytes).
+    pdf_file = pitchDeck.file
+    # Cheap checks first, so oversized or non-PDF uploads never reach the parser
+    if (pitchDeck.size or 0) > MAX_PDF_BYTES:
+        raise HTTPException(status_code=413, detail=f"pitchDeck exceeds the {MAX_PDF_BYTES}-byte limit")
+    if not _has_pdf_header(pdf_file):
+        raise HTTPException(status_code=400, detail="pitchDeck is not a valid PDF file")
+    # The same deck is often uploaded repeatedly: reuse its extracted text/summary by content hash.
+    # The hashing pass also counts the bytes (enforcing MAX_PDF_BYTES when no size was
+    # declared), so the size needs no extra seek.
+    pdf_hash, pdf_size = await run_in_threadpool(_hash_pdf, pdf_file)
+    # Check the cache before parsing: a hit skips extraction entirely. (A threadpool parse
+    # can't be cancelled, so overlapping the two would parse every upload even on a hit.)
+    cached_deck = await fetch_pdf_cache(pdf_hash) or {}
+    deck_summary = cached_deck.get("deck_summary")
+    extracted_text = cached_deck.get("extracted_text")
+    cache_dirty = not extracted_text
+    if cache_dirty:
+        # PDF parsing is CPU-bound; run the whole parse in one worker thread so the event loop keeps serving
+        extracted_text = await run_in_threadpool(_extract_pdf_text, pdf_file)
+
+    # Short decks go straight into the icebreaker prompt (one Groq round-trip);
+    # only long decks pay for a separate summarization call.
+    if len(extracted_text) <= DECK_INLINE_MAX_CHARS:
+        deck_summary = None
+        deck_label = "Sales Deck Content"
+        deck_context = extracted_text
+    else:
+        if not deck_summary:
+            deck_summary = await _summarize_deck_with_groq(get_async_groq_client(), extracted_text)
+            cache_dirty = True
+        deck_label = "Sales Deck Summary (auto-generated)"
+        deck_context = deck_summary
+
+    if cache_dirty:
+        background_tasks.add_task(upsert_pdf_cache, pdf_hash, extracted_text, deck_summary)
 
     prompt = (
         "Using the following information, craft a personalized outreach icebreaker message."
@@ -132,78 +377,165 @@ async def generate_icebreaker_from_pdf_controller(
         "\n\nBe creative but authentic — sound like a human who did their homework."
         "\n\nInputs:"
         f"\nLinkedIn About Section:\n{linkedinBio}"
-        f"\n\nSales Deck Summary (auto-generated):\n{deck_summary}"
+        f"\n\n{deck_label}:\n{deck_context}"
     )
 
-    chat_completion = _groq_client().chat.completions.create(
-        messages=[
-            {"role": "system", "content": "You are an expert sales copywriter."},
-            {"role": "user", "content": prompt},
-        ],
-        model=os.getenv("GROQ_MODEL", "allam-2-7b"),
-        temperature=0.3,
-    )
+    messages = [
+        {"role": "system", "content": "You are an expert sales copywriter."},
+        {"role": "user", "content": prompt},
+    ]
+    log_input = {
+        "linkedinBio": linkedinBio,
+        "pitchDeck": {
+            "filename": getattr(pitchDeck, "filename", None),
+            "content_type": pitchDeck.content_type,
+            "bytes": pdf_size,
+            "md5": pdf_hash,
+        },
+        "extracted_text_preview": extracted_text[:1000],
+        "deck_summary": deck_summary,
+    }
+    return messages, log_input
+
+
+def _clean_icebreaker_text(content: str) -> str:
+    content = " ".join(content.split())
+    content = _GREETING_RE.sub("", content)
+    return _BRACKET_RE.sub("", content)
 
-    content = _extract_choice_content(chat_completion)
-    content = re.sub(r"\s+", " ", content).strip()
-    content = re.sub(r"^(dear|hi|hello)\b[^,]*,?\s*", "", content, flags=re.IGNORECASE)
-    content = re.sub(r"\[[^\]]+\]", "", content)
-    response = {"type": "Icebreaker", "result": content}
 
-    try:
-        await log_interaction(
-            route="/api/v1/generate-icebreaker-from-pdf",
-            input_payload={
-                "linkedinBio": linkedinBio,
-                "pitchDeck": {
-                    "filename": getattr(pitchDeck, "filename", None),
-                    "content_type": pitchDeck.content_type,
-                    "bytes": len(pdf_bytes),
-                },
-                "extracted_text_preview": extracted_text[:1000],
-                "deck_summary": deck_summary,
-            },
-            output_payload=response,
-            model=os.getenv("GROQ_MODEL"),
-        )
-    except Exception:
-        pass
+async def generate_icebreaker_from_pdf_controller(
+    linkedinBio: str,
+    pitchDeck: UploadFile,
+    background_tasks: BackgroundTasks,
+):
+    messages, log_input = await _prepare_pdf_icebreaker(linkedinBio, pitchDeck, background_tasks)
+
+    content, cached = await _cached_completion(get_async_groq_client(), messages=messages, temperature=0.3)
+    # Flag reused completions: at temperature 0.3 a fresh call could differ
+    response = {"type": "Icebreaker", "result": _clean_icebreaker_text(content), "cached": cached}
+
+    # Logging is side-channel metadata: queue it for the batch writer instead of waiting on Supabase
+    enqueue_interaction(
+        route="/api/v1/generate-icebreaker-from-pdf",
+        input_payload=log_input,
+        output_payload=response,
+        model=GROQ_MODEL,
+    )
 
     return response
 
 
-async def list_icebreakers_controller(limit: int = 20, offset: int = 0, type: str = "all"):
-    if not (
-        os.getenv("SUPABASE_URL") and (os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY"))
-    ):
+async def stream_icebreaker_from_pdf_controller(
+    linkedinBio: str,
+    pitchDeck: UploadFile,
+    background_tasks: BackgroundTasks,
+):
+    """Same as generate_icebreaker_from_pdf_controller, but streams the icebreaker as
+    Server-Sent Events while Groq generates it.
+
+    Events are `data: {"delta": "..."}` for raw text as it arrives, then a final
+    `data: {"done": true, "type": "Icebreaker", "result": "...", "cached": false}` carrying the
+    cleaned-up message (greeting/placeholder removal needs the full text), or
+    `data: {"error": "..."}` if generation fails mid-stream.
+    """
+    messages, log_input = await _prepare_pdf_icebreaker(linkedinBio, pitchDeck, background_tasks)
+    return StreamingResponse(
+        _icebreaker_event_stream(messages, log_input),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache"},
+    )
+
+
+def _sse(data: Dict[str, Any]) -> str:
+    payload = orjson.dumps(data).decode() if orjson is not None else json.dumps(data)
+    return f"data: {payload}\n\n"
+
+
+async def _icebreaker_event_stream(messages: List[dict], log_input: Dict[str, Any]):
+    key = llm_cache.make_cache_key(GROQ_MODEL, messages, 0.3)
+    try:
+        content = await llm_cache.get_cached(key)
+        cached = content is not None
+        if cached:
+            yield _sse({"delta": content})
+        else:
+            parts: List[str] = []
+            stream = await get_async_groq_client().chat.completions.create(
+                messages=messages, model=GROQ_MODEL, temperature=0.3, stream=True
+            )
+            async for chunk in stream:
+                delta = chunk.choices[0].delta.content if chunk.choices else None
+                if delta:
+                    parts.append(delta)
+                    yield _sse({"delta": delta})
+            content = "".join(parts)
+            await llm_cache.set_cached(key, content)
+    except Exception as e:
+        logger.exception("Icebreaker stream failed: %s", e)
+        yield _sse({"error": f"Icebreaker generation failed: {e.__class__.__name__}"})
+        return
+
+    response = {"type": "Icebreaker", "result": _clean_icebreaker_text(content), "cached": cached}
+    # Queue the log before the terminal event: once the client has "done" it may disconnect,
+    # and Starlette then stops iterating this generator, so nothing after the yield would run
+    enqueue_interaction(
+        route="/api/v1/generate-icebreaker-from-pdf",
+        input_payload=log_input,
+        output_payload=response,
+        model=GROQ_MODEL,
+    )
+    yield _sse({"done": True, **response})
+
+
+async def list_icebreakers_controller(
+    limit: int = 20, offset: int = 0, type: str = "all", before: Optional[str] = None
+):
+    if not supabase_logger.SUPABASE_READY:
         raise HTTPException(status_code=503, detail="Supabase is not configured on the server")
 
+    if before:
+        try:
+            decode_cursor(before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
     type = (type or "all").lower()
     route_plain = "/api/v1/generate-icebreaker"
     route_pdf = "/api/v1/generate-icebreaker-from-pdf"
 
+    cache_key = ("icebreakers", type, limit, offset, before)
+    cached = list_cache.get_cached(cache_key)
+    if cached is not None:
+        return cached
+
     if type == "plain":
-        rows = await fetch_interactions(route=route_plain, limit=limit, offset=offset)
-        return {"items": rows, "limit": limit, "offset": offset, "type": type}
-    if type == "pdf":
-        rows = await fetch_interactions(route=route_pdf, limit=limit, offset=offset)
-        return {"items": rows, "limit": limit, "offset": offset, "type": type}
-
-    rows_plain = await fetch_interactions(route=route_plain, limit=limit, offset=0)
-    rows_pdf = await fetch_interactions(route=route_pdf, limit=limit, offset=0)
-    merged = rows_plain + rows_pdf
-    try:
-        merged.sort(key=lambda r: r.get("created_at", ""), reverse=True)
-    except Exception:
-        pass
-    sliced = merged[offset : offset + limit]
-    return {"items": sliced, "limit": limit, "offset": offset, "type": "all"}
+        rows = await fetch_interactions(
+            route=route_plain, limit=limit, offset=offset, select=FEED_COLUMNS, before=before
+        )
+    elif type == "pdf":
+        rows = await fetch_interactions(
+            route=route_pdf, limit=limit, offset=offset, select=FEED_COLUMNS, before=before
+        )
+    else:
+        type = "all"
+        rows = await fetch_interactions_multi(
+            routes=[route_plain, route_pdf], limit=limit, offset=offset, select=FEED_COLUMNS, before=before
+        )
+
+    response = {
+        "items": rows,
+        "limit": limit,
+        "offset": offset,
+        "type": type,
+        "next_cursor": next_cursor(rows, limit),
+    }
+    list_cache.set_cached(cache_key, response)
+    return response
 
 
 async def delete_icebreaker_controller(id: str):
-    if not (
-        os.getenv("SUPABASE_URL") and (os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY"))
-    ):
+    if not supabase_logger.SUPABASE_READY:
         raise HTTPException(status_code=503, detail="Supabase is not configured on the server")
 
     deleted = await delete_interaction_by_id(id)
@@ -213,11 +545,14 @@ async def delete_icebreaker_controller(id: str):
 
 
 async def enqueue_icebreaker_job_controller(
-    background_tasks: BackgroundTasks, linkedinBio: str, deckText: str
+    background_tasks: BackgroundTasks, linkedinBio: str, deckText: str, mode: Optional[str] = None
 ):
     try:
-        callback_endpoint = build_callback_url("/api/v1/icebreakers/callback")
         payload = {"linkedinBio": linkedinBio, "deckText": deckText}
+        if (mode or "").lower() == "batch":
+            return {"job_id": enqueue_batch_job("icebreaker", payload), "status": "queued", "mode": "batch"}
+
+        callback_endpoint = build_callback_url("/api/v1/icebreakers/callback")
 
         if is_loopback_or_private(callback_endpoint):
             background_tasks.add_task(process_icebreaker_task, payload)
@@ -232,14 +567,15 @@ async def enqueue_icebreaker_job_controller(
 
 async def process_icebreaker_callback_controller(request: Request, background_tasks: BackgroundTasks):
     try:
-        await verify_qstash_request(request)
         raw = await request.body()
+        await verify_qstash_request(request, raw)
         try:
-            body = json.loads(raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw)
+            body = decode_qstash_body(request, raw)
         except Exception:
             body = {}
 
-        background_tasks.add_task(process_icebreaker_task, body)
+        # QStash keeps the message id across redeliveries: it keys the log row (idempotency)
+        background_tasks.add_task(process_icebreaker_task, body, request.headers.get("upstash-message-id"))
         return {"status": "processing"}
     except HTTPException:
         raise
@@ -1,8 +1,8 @@
 import os
 import asyncio
-import json
+import logging
 import uuid
-from typing import Dict, Any, Set
+from typing import Dict, Any, Optional, Set
 from fastapi import HTTPException, Request, BackgroundTasks
 from pydantic import BaseModel
 
@@ -10,15 +10,34 @@ from src.services.qstash_client import (
     get_qstash_client,
     qstash_publish_json,
     verify_qstash_request,
+    decode_qstash_body,
     build_callback_url,
     is_loopback_or_private,
 )
-from src.services.supabase_logger import fetch_interactions, delete_interaction_by_id
-from src.services.tasks import process_transcript as process_transcript_task
+from src.services.supabase_logger import (
+    fetch_interactions,
+    delete_interaction_by_id,
+    enqueue_interaction,
+    decode_cursor,
+    next_cursor,
+    FEED_COLUMNS,
+)
+from src.services import list_cache, supabase_logger
+from src.services.tasks import process_transcript as process_transcript_task, enqueue_batch_job
+from src.services.groq_client import GROQ_MODEL
+
+logger = logging.getLogger(__name__)
 
 # Global set to track running tasks and prevent garbage collection
 _running_tasks: Set[asyncio.Task] = set()
 
+# Backpressure: at most MAX_CONCURRENT_JOBS transcripts are processed at once; the rest
+# wait on the semaphore. Past MAX_PENDING_JOBS tracked tasks, callbacks get a 429 so
+# QStash backs off and redelivers later instead of the process piling up coroutines.
+MAX_CONCURRENT_JOBS = int(os.getenv("MAX_CONCURRENT_JOBS", "16"))
+MAX_PENDING_JOBS = int(os.getenv("MAX_PENDING_JOBS", "500"))
+_task_sem = asyncio.Semaphore(MAX_CONCURRENT_JOBS)
+
 
 class TranscriptRequest(BaseModel):
     """Request model for transcript analysis submission."""
@@ -27,30 +46,51 @@ class TranscriptRequest(BaseModel):
     attendees: str
     date: str
     transcript: str
+    # "batch" routes the job through the Groq Batch API (cheaper, slower); default is the queue
+    mode: Optional[str] = None
 
 
-async def list_transcripts_controller(limit: int = 20, offset: int = 0):
+async def list_transcripts_controller(limit: int = 20, offset: int = 0, before: Optional[str] = None):
     """
     Fetch a paginated list of transcript analysis records from Supabase.
     
     Args:
         limit: Maximum number of records to return (default: 20)
         offset: Number of records to skip for pagination (default: 0)
+        before: Keyset cursor from a previous page's next_cursor (preferred over offset)
     
     Returns:
         Dict containing:
             - items: List of transcript records
             - limit: Applied limit
             - offset: Applied offset
+            - next_cursor: Pass as `before` to get the next page (None on the last page)
     
     Raises:
+        HTTPException(400): If `before` is not a cursor from next_cursor
         HTTPException(503): If Supabase is not configured
     """
-    if not (os.getenv("SUPABASE_URL") and (os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY"))):
+    if not supabase_logger.SUPABASE_READY:
         raise HTTPException(status_code=503, detail="Supabase is not configured on the server")
 
-    rows = await fetch_interactions(route="/api/v1/analyze-transcript", limit=limit, offset=offset)
-    return {"items": rows, "limit": limit, "offset": offset}
+    if before:
+        try:
+            decode_cursor(before)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    # The feed is polled every second; serve repeated identical polls from a short-lived cache
+    cache_key = ("transcripts", limit, offset, before)
+    cached = list_cache.get_cached(cache_key)
+    if cached is not None:
+        return cached
+
+    rows = await fetch_interactions(
+        route="/api/v1/analyze-transcript", limit=limit, offset=offset, select=FEED_COLUMNS, before=before
+    )
+    response = {"items": rows, "limit": limit, "offset": offset, "next_cursor": next_cursor(rows, limit)}
+    list_cache.set_cached(cache_key, response)
+    return response
 
 
 async def delete_transcript_controller(id: str):
@@ -69,7 +109,7 @@ async def delete_transcript_controller(id: str):
         HTTPException(503): If Supabase is not configured
         HTTPException(404): If transcript with given ID is not found
     """
-    if not (os.getenv("SUPABASE_URL") and (os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY"))):
+    if not supabase_logger.SUPABASE_READY:
         raise HTTPException(status_code=503, detail="Supabase is not configured on the server")
 
     deleted = await delete_interaction_by_id(id)
@@ -83,10 +123,11 @@ async def enqueue_transcript_job_controller(data: TranscriptRequest, background_
     Enqueue a transcript analysis job either via QStash (production) or local processing (dev).
     
     Flow:
-    1. Build callback URL from BACKEND_URL environment variable
-    2. Check if URL is localhost/private (dev mode) or public (production)
-    3. Dev mode: Process immediately in background without QStash
-    4. Production: Send job to QStash queue which will callback when ready
+    1. If data.mode == "batch": hand the job to the Groq Batch API collector (bulk runs)
+    2. Build callback URL from BACKEND_URL environment variable
+    3. Check if URL is localhost/private (dev mode) or public (production)
+    4. Dev mode: Process immediately in background without QStash
+    5. Production: Send job to QStash queue which will callback when ready
     
     Args:
         data: TranscriptRequest containing all transcript metadata and content
@@ -96,19 +137,24 @@ async def enqueue_transcript_job_controller(data: TranscriptRequest, background_
         Dict containing:
             - job_id: Unique identifier for tracking (QStash messageId or local UUID)
             - status: Always "queued" to indicate job is accepted
-            - mode: Either "local" (dev) or "qstash" (production)
+            - mode: "local" (dev), "qstash" (production) or "batch" (Groq Batch API)
     
     Raises:
         HTTPException(500): If job enqueueing fails
     """
     try:
+        # Serialize once; the same dict feeds the batch, local and QStash paths
+        payload = data.model_dump()
+
+        # Bulk/offline mode: collect into a Groq batch instead of one chat call per job
+        if (data.mode or "").lower() == "batch":
+            return {"job_id": enqueue_batch_job("transcript", payload), "status": "queued", "mode": "batch"}
+
         # Build the callback URL that QStash will POST to when processing
         callback_endpoint = build_callback_url("/api/v1/transcripts/callback")
 
         # Local/dev mode: Process immediately without QStash
         if is_loopback_or_private(callback_endpoint):
-            payload = data.model_dump() if hasattr(data, "model_dump") else data.dict()
-            
             # Create task and keep reference to prevent garbage collection
             task = asyncio.create_task(_process_with_cleanup(payload))
             _running_tasks.add(task)
@@ -118,12 +164,12 @@ async def enqueue_transcript_job_controller(data: TranscriptRequest, background_
 
         # Production mode: Use QStash for reliable distributed processing
         client = get_qstash_client()
-        response = qstash_publish_json(client, url=callback_endpoint, body=data.model_dump())
+        response = qstash_publish_json(client, url=callback_endpoint, body=payload)
         
         return {"job_id": response.get("messageId"), "status": "queued", "mode": "qstash"}
         
     except Exception as e:
-        print(f"[ERROR] Failed to enqueue transcript job: {e}")
+        logger.exception("Failed to enqueue transcript job: %s", e)
         raise HTTPException(status_code=500, detail=f"Failed to enqueue job: {str(e)}")
 
 
@@ -138,9 +184,10 @@ async def _process_with_cleanup(payload: Dict[str, Any]):
         payload: Transcript data to process
     """
     try:
-        await process_transcript_task(payload)
+        async with _task_sem:
+            await process_transcript_task(payload)
     except Exception as e:
-        print(f"[ERROR] Background transcript processing failed: {e}")
+        logger.exception("Background transcript processing failed: %s", e)
 
 
 async def process_transcript_callback_controller(request: Request, background_tasks: BackgroundTasks):
@@ -155,7 +202,7 @@ async def process_transcript_callback_controller(request: Request, background_ta
     3. For short jobs (<30s): Process synchronously and return result
     4. For long jobs (60s+): Acknowledge immediately, process in background with error tracking
     
-    With the 60-second artificial delay, we use approach #4 to avoid QStash timeouts.
+    Jobs can run long (LLM call, optional TASKS_ARTIFICIAL_DELAY), so we use approach #4 to avoid QStash timeouts.
     
     Why this works:
     - QStash gets quick 202 response (won't timeout/retry)
@@ -180,24 +227,33 @@ async def process_transcript_callback_controller(request: Request, background_ta
     """
     try:
         # SECURITY: Verify this request actually came from QStash
-        await verify_qstash_request(request)
-
-        # Parse the callback payload
+        # Read the body once; it feeds both signature verification and parsing
         raw = await request.body()
+        await verify_qstash_request(request, raw)
+
+        # Parse the callback payload (gunzipped first if the publisher compressed it)
         try:
-            body = json.loads(raw.decode("utf-8") if isinstance(raw, (bytes, bytearray)) else raw)
+            body = decode_qstash_body(request, raw)
         except Exception as parse_error:
-            print(f"[ERROR] Failed to parse callback body: {parse_error}")
+            logger.error("Failed to parse callback body: %s", parse_error)
             raise HTTPException(status_code=400, detail="Invalid JSON payload")
 
         # Extract identifier for tracking
         job_id = body.get("name", "unknown")
         
-        print(f"[INFO] Received QStash callback for job: {job_id}")
+        logger.info("Received QStash callback for job: %s", job_id)
+
+        # BACKPRESSURE: Too much in flight - let QStash retry with its own backoff
+        if len(_running_tasks) >= MAX_PENDING_JOBS:
+            logger.warning("Rejecting job %s: %d tasks already pending", job_id, len(_running_tasks))
+            raise HTTPException(status_code=429, detail="Too many jobs in progress, retry later")
         
         # STRATEGY: Background processing with error tracking
         # This prevents QStash timeouts with the 60-second delay
-        task = asyncio.create_task(_process_with_error_tracking(body, job_id))
+        # QStash keeps the message id across redeliveries: it keys the log row (idempotency)
+        task = asyncio.create_task(
+            _process_with_error_tracking(body, job_id, request.headers.get("upstash-message-id"))
+        )
         _running_tasks.add(task)
         task.add_done_callback(_running_tasks.discard)
         
@@ -209,14 +265,14 @@ async def process_transcript_callback_controller(request: Request, background_ta
         raise
     except Exception as e:
         # Log unexpected errors
-        print(f"[ERROR] Callback handling failed: {e.__class__.__name__}: {str(e)}")
+        logger.exception("Callback handling failed: %s: %s", e.__class__.__name__, e)
         raise HTTPException(
             status_code=500, 
             detail=f"Callback failed: {e.__class__.__name__}: {str(e)}"
         )
 
 
-async def _process_with_error_tracking(payload: Dict[str, Any], job_id: str):
+async def _process_with_error_tracking(payload: Dict[str, Any], job_id: str, job_key: Optional[str] = None):
     """
     Process transcript with comprehensive error tracking and logging.
     
@@ -234,14 +290,17 @@ async def _process_with_error_tracking(payload: Dict[str, Any], job_id: str):
     Args:
         payload: Transcript data to process
         job_id: Identifier for tracking in logs
+        job_key: QStash message id, passed on as the log row's idempotency key
     """
     try:
-        print(f"[INFO] Starting background processing for job: {job_id}")
+        logger.info("Starting background processing for job: %s", job_id)
         
-        # Process the transcript (includes LLM call + Supabase logging)
-        result = await process_transcript_task(payload)
+        # Process the transcript (includes LLM call + Supabase logging);
+        # the semaphore caps how many run concurrently
+        async with _task_sem:
+            result = await process_transcript_task(payload, job_key)
         
-        print(f"[SUCCESS] Job completed successfully: {job_id}")
+        logger.info("Job completed successfully: %s", job_id)
         
     except Exception as e:
         # CRITICAL: Log the failure details
@@ -249,23 +308,21 @@ async def _process_with_error_tracking(payload: Dict[str, Any], job_id: str):
         # - Storing in a failures table
         # - Sending to monitoring service (Sentry, etc.)
         # - Triggering manual retry mechanism
-        print(f"[ERROR] Job failed: {job_id}")
-        print(f"[ERROR] Error type: {e.__class__.__name__}")
-        print(f"[ERROR] Error message: {str(e)}")
-        print(f"[ERROR] Payload: {payload.get('company', 'N/A')} - {payload.get('name', 'N/A')}")
+        logger.error("Job failed: %s (%s: %s)", job_id, e.__class__.__name__, e)
+        # Payload details only at DEBUG: skips the formatting cost when debug is off
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("Failed job payload: %s - %s", payload.get("company", "N/A"), payload.get("name", "N/A"))
         
-        # Optional: Store failure in Supabase for tracking
-        try:
-            from src.services.supabase_logger import log_interaction
-            await log_interaction(
-                route="/api/v1/analyze-transcript-failed",
-                input_payload=payload,
-                output_payload={"error": str(e), "error_type": e.__class__.__name__},
-                model=os.getenv("GROQ_MODEL"),
-                extra={"job_id": job_id, "status": "failed"}
-            )
-        except Exception as log_error:
-            print(f"[ERROR] Could not log failure to Supabase: {log_error}")
+        # Optional: Store failure in Supabase for tracking (queued; the background
+        # writer batches it, so a failing job doesn't also wait on Supabase)
+        if not enqueue_interaction(
+            route="/api/v1/analyze-transcript-failed",
+            input_payload=payload,
+            output_payload={"error": str(e), "error_type": e.__class__.__name__},
+            model=GROQ_MODEL,
+            extra={"job_id": job_id, "status": "failed"}
+        ):
+            logger.error("Could not queue failure log for job: %s", job_id)
 
 
 # Optional: Add endpoint to check processing health and active tasks
@@ -277,11 +334,14 @@ async def get_processing_stats():
     
     Returns:
         Dict containing:
-            - active_tasks: Number of currently running background tasks
+            - active_tasks: Number of tracked background tasks (running or waiting)
+            - max_concurrent / max_pending: Configured backpressure limits
             - task_ids: List of tracked task IDs (for debugging)
     """
     return {
         "active_tasks": len(_running_tasks),
+        "max_concurrent": MAX_CONCURRENT_JOBS,
+        "max_pending": MAX_PENDING_JOBS,
         "task_details": [
             {
                 "done": task.done(),
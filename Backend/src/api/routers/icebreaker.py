@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, UploadFile, File, Form, Request, BackgroundTasks
 from src.api.controllers import icebreaker_controller as ic
 
@@ -6,15 +8,25 @@ icebreaker_router = APIRouter()
 
 @icebreaker_router.post("/generate-icebreaker-from-pdf")
 async def generate_icebreaker_from_pdf(
+    background_tasks: BackgroundTasks,
+    linkedinBio: str = Form(...),
+    pitchDeck: UploadFile = File(...),
+):
+    return await ic.generate_icebreaker_from_pdf_controller(linkedinBio, pitchDeck, background_tasks)
+
+
+@icebreaker_router.post("/generate-icebreaker-from-pdf/stream")
+async def stream_icebreaker_from_pdf(
+    background_tasks: BackgroundTasks,
     linkedinBio: str = Form(...),
     pitchDeck: UploadFile = File(...),
 ):
-    return await ic.generate_icebreaker_from_pdf_controller(linkedinBio, pitchDeck)
+    return await ic.stream_icebreaker_from_pdf_controller(linkedinBio, pitchDeck, background_tasks)
 
 
 @icebreaker_router.get("/icebreakers")
-async def list_icebreakers(limit: int = 20, offset: int = 0, type: str = "all"):
-    return await ic.list_icebreakers_controller(limit=limit, offset=offset, type=type)
+async def list_icebreakers(limit: int = 20, offset: int = 0, type: str = "all", before: Optional[str] = None):
+    return await ic.list_icebreakers_controller(limit=limit, offset=offset, type=type, before=before)
 
 
 @icebreaker_router.delete("/icebreakers/{id}")
@@ -28,8 +40,9 @@ async def enqueue_icebreaker_job(
     background_tasks: BackgroundTasks,
     linkedinBio: str = Form(...),
     deckText: str = Form(...),
+    mode: Optional[str] = Form(None),
 ):
-    return await ic.enqueue_icebreaker_job_controller(background_tasks, linkedinBio, deckText)
+    return await ic.enqueue_icebreaker_job_controller(background_tasks, linkedinBio, deckText, mode)
 
 
 @icebreaker_router.post("/icebreakers/callback")
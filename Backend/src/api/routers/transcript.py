@@ -1,3 +1,5 @@
+from typing import Optional
+
 from fastapi import APIRouter, Request, BackgroundTasks
 from src.api.controllers import transcript_controller as tc
 
@@ -5,8 +7,8 @@ transcript_router = APIRouter()
 
 
 @transcript_router.get("/transcripts")
-async def list_transcripts(limit: int = 20, offset: int = 0):
-    return await tc.list_transcripts_controller(limit=limit, offset=offset)
+async def list_transcripts(limit: int = 20, offset: int = 0, before: Optional[str] = None):
+    return await tc.list_transcripts_controller(limit=limit, offset=offset, before=before)
 
 
 @transcript_router.delete("/transcripts/{id}")
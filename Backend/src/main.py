@@ -1,12 +1,67 @@
+from contextlib import asynccontextmanager
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, ORJSONResponse
 from dotenv import load_dotenv
 from src.api.routers.transcript import transcript_router
 from src.api.routers.icebreaker import icebreaker_router
+from src.services import supabase_logger
+from src.services.supabase_logger import start_log_writer, stop_log_writer, close_client
 import os
 
 load_dotenv()
-app = FastAPI()
+
+# Serialize responses with orjson when available (notably faster on the list endpoints)
+try:
+    import orjson  # noqa: F401
+    _default_response_class = ORJSONResponse
+except Exception:  # pragma: no cover - fall back to stdlib json
+    _default_response_class = JSONResponse
+
+
+def _configure_logging() -> QueueListener:
+    """Route the app's `src.*` loggers through a queue.
+
+    Request handlers only enqueue records; a listener thread does the actual
+    (blocking) write to stderr, so concurrent callbacks never contend on it.
+    """
+    log_queue: "queue.SimpleQueue[logging.LogRecord]" = queue.SimpleQueue()
+    handler = logging.StreamHandler()
+    handler.setFormatter(logging.Formatter("[%(levelname)s] %(name)s: %(message)s"))
+
+    app_logger = logging.getLogger("src")
+    app_logger.setLevel(os.getenv("LOG_LEVEL", "INFO").upper())
+    app_logger.addHandler(QueueHandler(log_queue))
+    app_logger.propagate = False
+    return QueueListener(log_queue, handler, respect_handler_level=True)
+
+
+_log_listener = _configure_logging()
+logger = logging.getLogger("src.main")
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    _log_listener.start()
+    # Supabase config is validated once at import; surface a misconfiguration in the deploy
+    # log here rather than as per-request 503s (the app still serves, without persistence)
+    if supabase_logger.SUPABASE_CONFIG_ERROR:
+        logger.warning("Supabase logging disabled: %s", supabase_logger.SUPABASE_CONFIG_ERROR)
+    start_log_writer()
+    try:
+        yield
+    finally:
+        # Flush queued interaction logs before the process exits
+        await stop_log_writer()
+        await close_client()
+        _log_listener.stop()
+
+
+app = FastAPI(lifespan=lifespan, default_response_class=_default_response_class)
 
 origins_str = os.getenv("CLIENT_URL", "http://localhost:8000, http://127.0.0.1:3000")
 origins = [origin.strip() for origin in origins_str.split(",")]
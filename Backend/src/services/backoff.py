@@ -0,0 +1,49 @@
+import random
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Optional
+
+# Retry pacing shared by the Supabase log writer and the task retry loops.
+# Computed delays are jittered (x0.5-1.5) so concurrent workers that failed together
+# don't retry in lockstep; a server-supplied Retry-After wins over the computed delay.
+# Every wait is capped at BACKOFF_MAX_DELAY, which bounds the total time a retry loop can take.
+BACKOFF_MAX_DELAY = 30.0
+
+
+def retry_after_seconds(headers: Any) -> Optional[float]:
+    """Parse Retry-After (delta-seconds or HTTP-date) or retry-after-ms from response headers."""
+    if not headers:
+        return None
+    value = headers.get("retry-after-ms")
+    if value:
+        try:
+            return max(0.0, float(value) / 1000)
+        except ValueError:
+            pass
+    value = headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def retry_after_from_exception(exc: BaseException) -> Optional[float]:
+    """Retry-After carried by an error (SupabaseRateLimited, or an SDK error's HTTP response)."""
+    retry_after = getattr(exc, "retry_after", None)
+    if retry_after is not None:
+        return retry_after
+    response = getattr(exc, "response", None)
+    return retry_after_seconds(getattr(response, "headers", None))
+
+
+def backoff_delay(attempt: int, base: float, retry_after: Optional[float] = None) -> float:
+    """Seconds to wait before retry number `attempt` (0-based)."""
+    if retry_after is not None:
+        return min(BACKOFF_MAX_DELAY, retry_after) + random.uniform(0, 0.5)
+    return min(BACKOFF_MAX_DELAY, base * 2 ** attempt * random.uniform(0.5, 1.5))
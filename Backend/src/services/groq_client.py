@@ -0,0 +1,47 @@
+import os
+from functools import lru_cache
+from typing import TYPE_CHECKING
+
+import httpx
+from dotenv import load_dotenv
+
+if TYPE_CHECKING:  # the SDK is imported lazily: it is the slowest import in the app
+    import openai
+
+load_dotenv()
+
+GROQ_BASE_URL = "https://api.groq.com/openai/v1"
+# Model for every chat completion (and the name recorded in interaction logs); read once at import
+GROQ_MODEL = os.getenv("GROQ_MODEL", "allam-2-7b")
+
+# Connection pool shared by every Groq call in the process (one pool per client)
+GROQ_MAX_CONNECTIONS = int(os.getenv("GROQ_MAX_CONNECTIONS", "100"))
+GROQ_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("GROQ_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+
+def _pool_limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_keepalive_connections=GROQ_MAX_KEEPALIVE_CONNECTIONS,
+        max_connections=GROQ_MAX_CONNECTIONS,
+    )
+
+
+@lru_cache(maxsize=1)
+def get_async_groq_client() -> "openai.AsyncOpenAI":
+    """Return the process-wide async Groq client (OpenAI-compatible SDK).
+
+    The client is built once and reused so every call shares one pooled
+    httpx connection to api.groq.com instead of re-doing the TLS handshake.
+    Use from async handlers so the event loop is free during the LLM round-trip
+    and independent completions can run concurrently via asyncio.gather.
+    """
+    import openai
+
+    return openai.AsyncOpenAI(
+        base_url=GROQ_BASE_URL,
+        api_key=os.getenv("GROQ_API_KEY"),
+        http_client=httpx.AsyncClient(
+            limits=_pool_limits(),
+            timeout=httpx.Timeout(120.0, connect=10.0),
+        ),
+    )
@@ -0,0 +1,40 @@
+import os
+import time
+from typing import Any, Dict, Hashable, Optional, Tuple
+
+# Short-lived cache for the feed/list endpoints, which the frontend polls every second.
+# A few seconds of staleness collapses bursts of identical polls into one Supabase query;
+# writes and deletes through supabase_logger clear it, so new rows show up immediately.
+LIST_CACHE_TTL_SECONDS = float(os.getenv("LIST_CACHE_TTL_SECONDS", "3"))
+LIST_CACHE_MAXSIZE = 256
+
+_cache: Dict[Hashable, Tuple[float, Any]] = {}
+
+
+def get_cached(key: Hashable) -> Optional[Any]:
+    """Return the cached list response for `key`, or None on miss/expiry."""
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        _cache.pop(key, None)
+        return None
+    return value
+
+
+def set_cached(key: Hashable, value: Any) -> None:
+    """Store a list response under `key` for LIST_CACHE_TTL_SECONDS."""
+    now = time.monotonic()
+    if len(_cache) >= LIST_CACHE_MAXSIZE:
+        # Drop expired entries first; if every entry is still live, start over
+        for stale in [k for k, (expires_at, _) in _cache.items() if expires_at < now]:
+            del _cache[stale]
+        if len(_cache) >= LIST_CACHE_MAXSIZE:
+            _cache.clear()
+    _cache[key] = (now + LIST_CACHE_TTL_SECONDS, value)
+
+
+def clear() -> None:
+    """Invalidate every cached list response (call after inserts/deletes)."""
+    _cache.clear()
@@ -0,0 +1,142 @@
+import os
+import json
+import logging
+import asyncio
+import time
+import hashlib
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# TTL cache for LLM completions, keyed by a hash of the exact request.
+# Backed by Redis when REDIS_URL is configured, otherwise by an in-process LRU.
+LLM_CACHE_TTL_SECONDS = float(os.getenv("LLM_CACHE_TTL_SECONDS", "86400"))
+LLM_CACHE_MAXSIZE = int(os.getenv("LLM_CACHE_MAXSIZE", "512"))
+LLM_CACHE_PREFIX = "llm_cache:"
+
+_cache: "OrderedDict[str, Tuple[float, str]]" = OrderedDict()
+
+# Completions currently being computed, so concurrent identical requests share one LLM call
+_inflight: "Dict[str, asyncio.Task[str]]" = {}
+
+# Optional: shared cache across workers/restarts when REDIS_URL is set
+# (redis is only imported in that case)
+_redis: Any = None
+if os.getenv("REDIS_URL"):
+    try:
+        import redis.asyncio as aioredis
+
+        _redis = aioredis.from_url(os.getenv("REDIS_URL"), decode_responses=True)
+    except Exception as e:
+        logger.warning("Redis cache unavailable, using in-process cache: %s", e)
+
+
+def _normalize_content(content: Any) -> Any:
+    """Trim surrounding whitespace only: casing and line breaks inside a prompt are meaningful
+    to the model (and can be quoted back), so they must not be merged into one cache entry."""
+    if isinstance(content, str):
+        return content.strip()
+    return content
+
+
+def make_cache_key(
+    model: Optional[str],
+    messages: List[Dict[str, Any]],
+    temperature: float,
+    max_tokens: Optional[int] = None,
+) -> str:
+    """
+    Build a stable cache key for a chat completion request.
+
+    Message contents are hashed as sent, apart from leading/trailing whitespace,
+    so only re-submissions of the same text hit the same entry.
+
+    Args:
+        model: Model name sent to the LLM
+        messages: Chat messages (system + user) sent to the LLM
+        temperature: Sampling temperature
+        max_tokens: Output token cap, if any (a capped answer differs from an uncapped one)
+
+    Returns:
+        Hex SHA-256 digest of the canonicalized request
+    """
+    normalized = [
+        {**message, "content": _normalize_content(message.get("content"))} for message in messages
+    ]
+    raw = json.dumps(
+        {"model": model, "messages": normalized, "temperature": temperature, "max_tokens": max_tokens},
+        sort_keys=True,
+        ensure_ascii=False,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+async def get_cached(key: str) -> Optional[str]:
+    """Return the cached completion for `key`, or None on miss/expiry."""
+    if _redis is not None:
+        try:
+            return await _redis.get(LLM_CACHE_PREFIX + key)
+        except Exception as e:
+            # Cache is best-effort: fall back to the local LRU if Redis is unreachable
+            logger.warning("Redis cache get failed: %s", e)
+    entry = _cache.get(key)
+    if entry is None:
+        return None
+    expires_at, value = entry
+    if expires_at < time.monotonic():
+        _cache.pop(key, None)
+        return None
+    _cache.move_to_end(key)
+    return value
+
+
+async def set_cached(key: str, value: str) -> None:
+    """Store a completion under `key`, evicting the least recently used entries when full."""
+    if _redis is not None:
+        try:
+            await _redis.set(LLM_CACHE_PREFIX + key, value, ex=int(LLM_CACHE_TTL_SECONDS))
+            return
+        except Exception as e:
+            logger.warning("Redis cache set failed: %s", e)
+    _cache[key] = (time.monotonic() + LLM_CACHE_TTL_SECONDS, value)
+    _cache.move_to_end(key)
+    while len(_cache) > LLM_CACHE_MAXSIZE:
+        _cache.popitem(last=False)
+
+
+async def get_or_compute(key: str, compute: Callable[[], Awaitable[str]]) -> Tuple[str, bool]:
+    """
+    Return the cached completion for `key`, computing it at most once across concurrent callers.
+
+    On a miss, the first caller starts `compute()` as a task; callers arriving while it
+    is still running await the same task instead of issuing a duplicate LLM call. The
+    result is cached, and errors propagate to every waiter. The task is shielded, so a
+    cancelled caller does not cancel the work the others are waiting on.
+
+    Args:
+        key: Cache key from make_cache_key
+        compute: Zero-argument coroutine function producing the completion text
+
+    Returns:
+        (completion text, cached): cached is True when the text was not generated for this
+        call (a cache hit, or an identical request already in flight). Completions are not
+        deterministic above temperature 0, so callers surface this flag with the result.
+    """
+    cached = await get_cached(key)
+    if cached is not None:
+        return cached, True
+
+    task = _inflight.get(key)
+    joined = task is not None
+    if task is None:
+        task = asyncio.ensure_future(_compute_and_store(key, compute))
+        _inflight[key] = task
+        task.add_done_callback(lambda _: _inflight.pop(key, None))
+    return await asyncio.shield(task), joined
+
+
+async def _compute_and_store(key: str, compute: Callable[[], Awaitable[str]]) -> str:
+    value = await compute()
+    await set_cached(key, value)
+    return value
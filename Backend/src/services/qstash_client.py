@@ -1,8 +1,17 @@
 import os
 import json
-from typing import Any, Dict, Optional
+import gzip
+import hmac
+import time
+import base64
+import hashlib
+import inspect
+import importlib.util
+from functools import lru_cache
+from typing import Any, Callable, Dict, Optional, Tuple
 
 from fastapi import HTTPException, Request
+from starlette.concurrency import run_in_threadpool
 from urllib.parse import quote
 import httpx
 from urllib.parse import urlparse
@@ -28,19 +37,146 @@ except Exception:  # pragma: no cover
     except Exception:
         _Receiver = None  # type: ignore
 
+# orjson serializes/parses job bodies (full transcripts, deck text) several times faster; optional.
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fall back to stdlib json
+    orjson = None  # type: ignore
+
 load_dotenv()
 
+# Gzip published bodies at least this large (0 disables compression). Callbacks decode
+# gzip bodies via decode_qstash_body, so only enable once every receiving instance has it.
+QSTASH_GZIP_MIN_BYTES = int(os.getenv("QSTASH_GZIP_MIN_BYTES", "0"))
+
+# QStash credentials and verification settings, read once at import (see _refresh_config)
+_QSTASH_TOKEN: Optional[str] = None
+_QSTASH_VERIFY = True
+_CURRENT_SIGNING_KEY: Optional[str] = None
+_NEXT_SIGNING_KEY: Optional[str] = None
+_BACKEND_URL: Optional[str] = None
+# Signature verifier built from the signing keys; None when the SDK or keys are missing
+_RECEIVER: Optional[Any] = None
+# How _RECEIVER.verify wants to be called (probed once from its signature, see _verify_call_shape)
+_VERIFY_KEYWORDS = True
+_VERIFY_WANTS_TEXT = False
+
+
+def _build_receiver(current_key: Optional[str], next_key: Optional[str]) -> Optional[Any]:
+    """Build the SDK Receiver, handling signature name variations across versions."""
+    if _Receiver is None or not current_key:
+        return None
+    for kwargs in (
+        {"current_signing_key": current_key, "next_signing_key": next_key},
+        {"signing_key": current_key},
+    ):
+        try:
+            return _Receiver(**{k: v for k, v in kwargs.items() if v})  # type: ignore[arg-type]
+        except Exception:
+            continue
+    return None
+
+
+def _verify_call_shape(receiver: Any) -> Tuple[bool, bool]:
+    """Return (keyword_args, wants_text) for receiver.verify.
+
+    SDK variants differ: some take keyword (signature=, body=, url=) and some positional
+    (signature, body); some hash a str body (calling .encode() on it), others take bytes.
+    """
+    try:
+        params = inspect.signature(receiver.verify).parameters
+    except (TypeError, ValueError):
+        return True, False
+    body_param = params.get("body")
+    if body_param is None:
+        return False, False
+    return True, body_param.annotation in (str, "str")
+
+
+def _refresh_config() -> None:
+    """(Re)load QStash settings from the environment. Runs at import; call again after changing env."""
+    global _QSTASH_TOKEN, _QSTASH_VERIFY, _CURRENT_SIGNING_KEY, _NEXT_SIGNING_KEY, _BACKEND_URL, _RECEIVER
+    global _VERIFY_KEYWORDS, _VERIFY_WANTS_TEXT
+    _QSTASH_TOKEN = os.getenv("QSTASH_TOKEN")
+    _QSTASH_VERIFY = str(os.getenv("QSTASH_VERIFY", "true")).lower() not in ("0", "false", "no")
+    _CURRENT_SIGNING_KEY = os.getenv("QSTASH_CURRENT_SIGNING_KEY") or os.getenv("QSTASH_SIGNING_KEY")
+    _NEXT_SIGNING_KEY = os.getenv("QSTASH_NEXT_SIGNING_KEY")
+    _BACKEND_URL = os.getenv("BACKEND_URL")
+    _RECEIVER = _build_receiver(_CURRENT_SIGNING_KEY, _NEXT_SIGNING_KEY)
+    if _RECEIVER is not None:
+        _VERIFY_KEYWORDS, _VERIFY_WANTS_TEXT = _verify_call_shape(_RECEIVER)
+    # Callback URLs are derived from BACKEND_URL; drop any built from the old value
+    if "build_callback_url" in globals():
+        build_callback_url.cache_clear()
+
+
+_refresh_config()
+
+
+def _json_bytes(body: Dict[str, Any]) -> bytes:
+    return orjson.dumps(body) if orjson is not None else json.dumps(body, separators=(",", ":")).encode("utf-8")
+
+
+def _encode_publish_body(body: Dict[str, Any]) -> Tuple[bytes, Dict[str, str]]:
+    """Serialize a job body once (compact JSON bytes), gzipping large bodies if enabled.
+
+    Returns (raw_body, forward_headers); forward_headers carries Content-Encoding when gzipped.
+    """
+    raw = _json_bytes(body)
+    if QSTASH_GZIP_MIN_BYTES > 0 and len(raw) >= QSTASH_GZIP_MIN_BYTES:
+        return gzip.compress(raw), {"Content-Encoding": "gzip"}
+    return raw, {}
+
+
+def decode_qstash_body(request: Request, raw_body: bytes) -> Any:
+    """Parse a QStash callback body (already signature-verified), un-gzipping it if needed.
+
+    Raises ValueError if the body is not valid (optionally gzipped) JSON.
+    """
+    if request.headers.get("content-encoding", "").lower() == "gzip":
+        try:
+            raw_body = gzip.decompress(raw_body)
+        except OSError as e:
+            raise ValueError(f"Invalid gzip body: {e}")
+    return orjson.loads(raw_body) if orjson is not None else json.loads(raw_body)
+
+
+# HTTP/2 (multiplexed, HPACK-compressed headers) when the optional h2 package is installed
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+
+@lru_cache(maxsize=1)
+def _publish_http_client(token: str) -> httpx.Client:
+    """Return the pooled HTTP client for the REST publish fallback (one per token).
+
+    Repeated publishes reuse keep-alive connections to qstash.upstash.io instead of
+    re-doing the TLS handshake; the auth header is set once on the client.
+    """
+    return httpx.Client(
+        base_url="https://qstash.upstash.io",
+        http2=_HTTP2,
+        headers={"Authorization": f"Bearer {token}"},
+        timeout=30.0,
+        limits=httpx.Limits(max_connections=50, max_keepalive_connections=20),
+    )
+
+
 def get_qstash_client():
     """Return an initialized QStash client using QSTASH_TOKEN.
 
     Raises HTTPException(500) if the token or SDK is not available.
     """
-    token = os.getenv("QSTASH_TOKEN")
-    if not token:
+    if not _QSTASH_TOKEN:
         raise HTTPException(status_code=500, detail="QSTASH_TOKEN not configured")
     if _QStash is None:
         # SDK not installed; return None and rely on HTTP fallback
         return None
+    return _sdk_client(_QSTASH_TOKEN)
+
+
+@lru_cache(maxsize=1)
+def _sdk_client(token: str) -> Any:
+    """Build the SDK client once per token, so publishes share its HTTP connection pool."""
     # Some SDK variants expect positional vs keyword; support both
     try:
         return _QStash(token=token)  # type: ignore[arg-type]
@@ -48,48 +184,86 @@ def get_qstash_client():
         return _QStash(token)  # type: ignore[call-arg]
 
 
+# Publisher signature: (client, url, body, payload_bytes, forward_headers) -> SDK/HTTP response
+_Publisher = Callable[[Any, str, Dict[str, Any], bytes, Dict[str, str]], Any]
+
+
+def _publish_message_raw(client: Any, url: str, body: Dict[str, Any], payload: bytes, fwd: Dict[str, str]) -> Any:
+    # Raw publish: the SDK sends our pre-serialized bytes without re-encoding them
+    return client.message.publish(url=url, body=payload, content_type="application/json", headers=fwd or None)
+
+
+def _publish_message_json(client: Any, url: str, body: Dict[str, Any], payload: bytes, fwd: Dict[str, str]) -> Any:
+    return client.message.publish_json(url=url, body=body)
+
+
+def _publish_json(client: Any, url: str, body: Dict[str, Any], payload: bytes, fwd: Dict[str, str]) -> Any:
+    return client.publish_json(url=url, body=body)
+
+
+def _publish_generic(client: Any, url: str, body: Dict[str, Any], payload: bytes, fwd: Dict[str, str]) -> Any:
+    # Generic publish, ensure JSON body; forward Content-Encoding when the payload is gzipped
+    try:
+        return client.publish(url=url, body=payload, content_type="application/json", headers=fwd or None)
+    except TypeError:
+        # Older variants may use different param names and can't forward headers, so a
+        # gzipped payload would reach the callback without Content-Encoding: send plain JSON
+        return client.publish(url=url, body=_json_bytes(body) if fwd else payload)
+
+
+def _publish_http(client: Any, url: str, body: Dict[str, Any], payload: bytes, fwd: Dict[str, str]) -> Any:
+    # Fallback to direct HTTP publish via QStash REST API using header forwarding.
+    # This avoids ambiguity around URL encoding in the path and works reliably.
+    token = _QSTASH_TOKEN
+    if not token:
+        raise HTTPException(status_code=500, detail="QSTASH_TOKEN not configured")
+    headers = {
+        "Content-Type": "application/json",
+        "Upstash-Forward-Url": url,
+    }
+    for name, value in fwd.items():
+        headers[f"Upstash-Forward-{name}"] = value
+    resp = _publish_http_client(token).post("/v2/publish", headers=headers, content=payload)
+    if resp.status_code >= 400:
+        raise HTTPException(status_code=500, detail=f"QStash publish failed: {resp.status_code} {resp.text}")
+    try:
+        return resp.json()
+    except Exception:
+        return {"raw": resp.text}
+
+
+def _select_publisher(client: Any) -> _Publisher:
+    """Pick the publish path this client supports (probed once per client, see _publisher_for)."""
+    message = getattr(client, "message", None)
+    if message is not None and hasattr(message, "publish"):
+        return _publish_message_raw
+    if message is not None and hasattr(message, "publish_json"):
+        return _publish_message_json
+    if hasattr(client, "publish_json"):
+        return _publish_json
+    if hasattr(client, "publish"):
+        return _publish_generic
+    return _publish_http
+
+
+# (client, publisher) for the last client seen; get_qstash_client returns a singleton,
+# so the hasattr probing runs once rather than on every publish
+_publisher_for: Optional[Tuple[Any, _Publisher]] = None
+
+
 def qstash_publish_json(client: Any, url: str, body: Dict[str, Any]) -> Dict[str, Any]:
     """Publish a JSON message to QStash, handling slight SDK API variations.
 
     Returns a response dict that contains at least a 'messageId' key when available.
     """
-    # Prefer JSON helpers when available
-    if hasattr(client, "message") and hasattr(client.message, "publish_json"):
-        resp = client.message.publish_json(url=url, body=body)
-    elif hasattr(client, "publish_json"):
-        resp = client.publish_json(url=url, body=body)
-    elif hasattr(client, "publish"):
-        # Generic publish, ensure JSON body
-        payload = json.dumps(body)
-        try:
-            resp = client.publish(url=url, body=payload, content_type="application/json")
-        except TypeError:
-            # Older variants may use different param names
-            resp = client.publish(url=url, body=payload)
-    else:
-        # Fallback to direct HTTP publish via QStash REST API using header forwarding.
-        # This avoids ambiguity around URL encoding in the path and works reliably.
-        token = os.getenv("QSTASH_TOKEN")
-        if not token:
-            raise HTTPException(status_code=500, detail="QSTASH_TOKEN not configured")
-        publish_url = "https://qstash.upstash.io/v2/publish"
-        headers = {
-            "Authorization": f"Bearer {token}",
-            "Content-Type": "application/json",
-            "Upstash-Forward-Url": url,
-        }
-        with httpx.Client(timeout=30.0) as client_http:
-            resp = client_http.post(publish_url, headers=headers, json=body)
-            if resp.status_code >= 400:
-                raise HTTPException(status_code=500, detail=f"QStash publish failed: {resp.status_code} {resp.text}")
-            try:
-                resp_json = resp.json()
-            except Exception:
-                resp_json = {"raw": resp.text}
-        # Normalize key
-        if isinstance(resp_json, dict) and "messageId" not in resp_json and "message_id" in resp_json:
-            resp_json["messageId"] = resp_json.get("message_id")
-        return resp_json
+    global _publisher_for
+    cached = _publisher_for
+    if cached is None or cached[0] is not client:
+        cached = _publisher_for = (client, _select_publisher(client))
+
+    # Serialize once; raw-bytes publish paths send this as-is
+    payload, forward_headers = _encode_publish_body(body)
+    resp = cached[1](client, url, body, payload, forward_headers)
 
     # Normalize response to a dict
     if isinstance(resp, dict):
@@ -105,52 +279,86 @@ def qstash_publish_json(client: Any, url: str, body: Dict[str, Any]) -> Dict[str
         return {"raw": resp}
 
 
-async def verify_qstash_request(request: Request) -> None:
+# Bodies at least this large are hashed in the threadpool: hashlib releases the GIL for
+# large inputs, so big callbacks verify in parallel without stalling the event loop.
+# Smaller bodies hash in microseconds, less than the thread hand-off costs.
+VERIFY_OFFLOAD_MIN_BYTES = int(os.getenv("QSTASH_VERIFY_OFFLOAD_MIN_BYTES", str(256 * 1024)))
+
+# _check_signature result for tokens it does not handle (anything but an HS256 JWT)
+_UNSUPPORTED = "unsupported"
+
+
+def _b64url_decode(segment: str) -> bytes:
+    return base64.urlsafe_b64decode(segment + "=" * (-len(segment) % 4))
+
+
+def _check_signature(signature: str, body: bytes, url: str) -> Optional[str]:
+    """Verify an Upstash-Signature JWT (HS256) against the signing keys, URL and raw body.
+
+    Same checks as the SDK Receiver (iss/sub/exp/nbf claims, sha256 body hash, current
+    then next key), but done with hmac.compare_digest over hashlib.sha256 and hashing the
+    raw bytes, so it needs no JWT library and also covers non-UTF-8 (gzipped) bodies.
+
+    Returns None when valid, the rejection reason when invalid, or _UNSUPPORTED when the
+    token is not an HS256 JWT (left to the SDK).
+    """
+    try:
+        header_b64, payload_b64, sig_b64 = signature.split(".")
+        header = json.loads(_b64url_decode(header_b64))
+        sig = _b64url_decode(sig_b64)
+    except Exception:
+        return _UNSUPPORTED
+    if not isinstance(header, dict) or header.get("alg") != "HS256":
+        return _UNSUPPORTED
+
+    signing_input = f"{header_b64}.{payload_b64}".encode("ascii")
+    for key in (_CURRENT_SIGNING_KEY, _NEXT_SIGNING_KEY):
+        if key and hmac.compare_digest(hmac.new(key.encode("utf-8"), signing_input, hashlib.sha256).digest(), sig):
+            break
+    else:
+        return "signature does not match the signing keys"
+
+    try:
+        claims = json.loads(_b64url_decode(payload_b64))
+        now = time.time()
+        if claims["iss"] != "Upstash":
+            return "invalid issuer"
+        if float(claims["exp"]) <= now:
+            return "signature has expired"
+        if float(claims["nbf"]) > now:
+            return "signature is not yet valid"
+        if claims["sub"] != url:
+            return f"invalid subject: {claims['sub']}, want: {url}"
+        expected = base64.urlsafe_b64encode(hashlib.sha256(body).digest()).decode("ascii").rstrip("=")
+        if not hmac.compare_digest(str(claims["body"]).rstrip("="), expected):
+            return "invalid body hash"
+    except (KeyError, TypeError, ValueError):
+        return "malformed signature claims"
+    return None
+
+
+async def verify_qstash_request(request: Request, raw_body: Optional[bytes] = None) -> None:
     """Verify that the incoming request is from QStash, if verification is configured.
 
-    - Uses Receiver from the SDK when available.
+    - Pass `raw_body` when the caller has already read the body, so it is read only once.
+    - Checks the HS256 signature locally (_check_signature); the SDK Receiver, when
+      available, only handles tokens that are not HS256 JWTs.
     - Requires env var QSTASH_CURRENT_SIGNING_KEY (and optional QSTASH_NEXT_SIGNING_KEY).
-    - If Receiver or keys are not present, this becomes a no-op for convenience during local dev.
+    - If the keys are not present, this becomes a no-op for convenience during local dev.
     """
     # Allow explicit opt-out via env (useful for debugging behind proxies)
-    if str(os.getenv("QSTASH_VERIFY", "true")).lower() in ("0", "false", "no"):
+    if not _QSTASH_VERIFY:
         return
 
-    if _Receiver is None:
-        # SDK Receiver not available; skip verification (acceptable for local/dev)
-        return
-
-    current_key = os.getenv("QSTASH_CURRENT_SIGNING_KEY") or os.getenv("QSTASH_SIGNING_KEY")
-    next_key = os.getenv("QSTASH_NEXT_SIGNING_KEY")
-    if not current_key:
-        # Not configured; skip verification
-        return
-
-    # Build receiver handling signature name variations across versions
-    receiver: Optional[Any] = None
-    for kwargs in (
-        {"current_signing_key": current_key, "next_signing_key": next_key},
-        {"signing_key": current_key},
-    ):
-        try:
-            receiver = _Receiver(**{k: v for k, v in kwargs.items() if v})  # type: ignore[arg-type]
-            break
-        except Exception:
-            continue
-    if receiver is None:
+    if not _CURRENT_SIGNING_KEY:
+        # Not configured; skip verification (acceptable for local/dev)
         return
 
     signature = request.headers.get("upstash-signature") or request.headers.get("Upstash-Signature")
     if not signature:
         raise HTTPException(status_code=401, detail="Missing Upstash-Signature header")
 
-    body_bytes = await request.body()
-    # Some SDK variants expect str and call .encode() internally; others accept bytes.
-    # Prepare both representations and try both to avoid AttributeError.
-    try:
-        body_text = body_bytes.decode("utf-8") if isinstance(body_bytes, (bytes, bytearray)) else str(body_bytes)
-    except Exception:
-        body_text = ""
+    body_bytes = raw_body if raw_body is not None else await request.body()
 
     # Reconstruct original public URL if behind a proxy (for signature verification)
     # Prefer forwarded headers if present; otherwise fall back to request.url
@@ -172,19 +380,37 @@ async def verify_qstash_request(request: Request) -> None:
     except Exception:
         url = str(request.url)
 
-    # Verify may throw on failure; let it propagate as 401
-    try:
-        # Prefer keyword form; first try bytes, then fall back to text
-        try:
-            receiver.verify(signature=signature, body=body_bytes, url=url)  # type: ignore[attr-defined]
-        except Exception:
-            receiver.verify(signature=signature, body=body_text, url=url)  # type: ignore[attr-defined]
-    except TypeError:
-        # Positional fallback: some variants may expect (signature, body)
+    if len(body_bytes) >= VERIFY_OFFLOAD_MIN_BYTES:
+        error = await run_in_threadpool(_check_signature, signature, body_bytes, url)
+    else:
+        error = _check_signature(signature, body_bytes, url)
+    if error is None:
+        return
+    if error is not _UNSUPPORTED:
+        raise HTTPException(status_code=401, detail=f"Invalid QStash signature: {error}")
+
+    # Not an HS256 JWT: defer to the SDK Receiver (built once in _refresh_config), if any
+    receiver = _RECEIVER
+    if receiver is None:
+        raise HTTPException(status_code=401, detail="Invalid QStash signature: unsupported format")
+
+    # Hand the body over in the form this SDK's verify hashes (probed once at config time)
+    body: Any = body_bytes
+    if _VERIFY_WANTS_TEXT:
         try:
-            receiver.verify(signature, body_bytes)  # type: ignore[misc]
-        except Exception:
-            receiver.verify(signature, body_text)  # type: ignore[misc]
+            body = body_bytes.decode("utf-8")
+        except UnicodeDecodeError:
+            raise HTTPException(status_code=401, detail="Cannot verify a non-UTF-8 request body")
+
+    # Verify throws on failure (bad signature, wrong URL, expired); surface it as 401
+    try:
+        if _VERIFY_KEYWORDS:
+            receiver.verify(signature=signature, body=body, url=url)  # type: ignore[attr-defined]
+        else:
+            # Positional variants expect (signature, body)
+            receiver.verify(signature, body)  # type: ignore[misc]
+    except Exception as e:
+        raise HTTPException(status_code=401, detail=f"Invalid QStash signature: {e}")
 
 
 def normalize_base_url(value: Optional[str]) -> str:
@@ -194,6 +420,9 @@ def normalize_base_url(value: Optional[str]) -> str:
     - Adds https:// for other hosts if missing
     - Strips trailing slash
     """
+    # Fast path: already normalized (scheme present, no trailing slash/whitespace)
+    if value and value.startswith(("https://", "http://")) and value[-1] != "/" and not value[-1].isspace():
+        return value
     if not value or not value.strip():
         raise HTTPException(status_code=500, detail="BACKEND_URL not configured")
     v = value.strip().rstrip("/")
@@ -209,19 +438,31 @@ def normalize_base_url(value: Optional[str]) -> str:
     return v
 
 
+@lru_cache(maxsize=32)
 def build_callback_url(path: str) -> str:
-    """Build a full callback URL from BACKEND_URL and the provided path."""
-    base = normalize_base_url(os.getenv("BACKEND_URL"))
+    """Build a full callback URL from BACKEND_URL and the provided path.
+
+    Memoized: callers pass a handful of literal routes and BACKEND_URL only
+    changes via _refresh_config (which clears the cache). A missing BACKEND_URL
+    raises, and exceptions are not cached.
+    """
+    base = normalize_base_url(_BACKEND_URL)
     if not path.startswith("/"):
         path = "/" + path
     return base + path
 
 
+# Common dev hosts, checked before any IP parsing
+_LOOPBACK_HOSTS = frozenset(("localhost", "ip6-localhost", "127.0.0.1", "0.0.0.0", "::1"))
+
+
+@lru_cache(maxsize=256)
 def is_loopback_or_private(url: str) -> bool:
     """Return True if URL resolves to localhost/loopback or private IP ranges.
 
     QStash rejects loopback/private destinations. For local development, use a
     tunnel and set BACKEND_URL to its public URL, or bypass QStash.
+    Pure function of the URL string, so results are memoized (the callback URLs repeat).
     """
     try:
         parsed = urlparse(url)
@@ -229,7 +470,7 @@ def is_loopback_or_private(url: str) -> bool:
         if not host:
             return True
         # Treat common dev hosts as loopback
-        if host in ("localhost", "ip6-localhost"):
+        if host in _LOOPBACK_HOSTS:
             return True
         try:
             ip = ipaddress.ip_address(host)
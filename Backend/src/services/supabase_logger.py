@@ -1,21 +1,262 @@
 import os
-from typing import Any, Dict, Optional
+import json
+import logging
+import base64
+import binascii
+import re
+import asyncio
+import importlib.util
+import uuid
+from typing import Any, Dict, List, Optional, Tuple
 
 import httpx
+from dotenv import load_dotenv
 
+# orjson encodes row bodies (multi-KB JSONB input/output) straight to bytes; optional.
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover - fall back to stdlib json
+    orjson = None  # type: ignore
 
-async def log_interaction(
+from src.services import list_cache
+from src.services.backoff import backoff_delay, retry_after_from_exception, retry_after_seconds
+from src.services.groq_client import GROQ_MODEL
+
+load_dotenv()
+
+logger = logging.getLogger(__name__)
+
+# Supabase settings, endpoints and request headers: resolved once at import (see
+# _refresh_config) instead of re-reading os.environ and rebuilding dicts on every call.
+_SUPABASE_URL: Optional[str] = None
+_SUPABASE_KEY: Optional[str] = None
+_TABLE = "llm_interactions"
+_ENDPOINT = ""
+_PDF_CACHE_ENDPOINT = ""
+_TRANSCRIPTS_ENDPOINT = ""
+_READ_HEADERS: Dict[str, str] = {}
+_INSERT_HEADERS: Dict[str, str] = {}
+_DELETE_HEADERS: Dict[str, str] = {}
+_UPSERT_HEADERS: Dict[str, str] = {}
+_IGNORE_DUPLICATES_HEADERS: Dict[str, str] = {}
+_INSERT_PARAMS: Dict[str, str] = {}
+
+# Whether Supabase credentials are configured at all (and, if not, what is missing)
+SUPABASE_READY = False
+SUPABASE_CONFIG_ERROR: Optional[str] = None
+# Stamp each logged row with a per-job key so a retried or redelivered insert of the same
+# job is ignored instead of duplicated. Needs a unique idempotency_key column (see README).
+SUPABASE_IDEMPOTENCY_KEYS = False
+# Transcripts stored once by hash (see store_transcript); off unless SUPABASE_TRANSCRIPTS_TABLE is set
+TRANSCRIPT_STORE_READY = False
+
+
+def _refresh_config() -> None:
+    """(Re)load Supabase settings from the environment. Runs at import; call again after changing env."""
+    global _SUPABASE_URL, _SUPABASE_KEY, _TABLE, _ENDPOINT, _PDF_CACHE_ENDPOINT, SUPABASE_READY
+    global _READ_HEADERS, _INSERT_HEADERS, _DELETE_HEADERS, _UPSERT_HEADERS
+    global _INSERT_PARAMS, SUPABASE_IDEMPOTENCY_KEYS, SUPABASE_CONFIG_ERROR
+    global _TRANSCRIPTS_ENDPOINT, _IGNORE_DUPLICATES_HEADERS, TRANSCRIPT_STORE_READY
+
+    _SUPABASE_URL = os.getenv("SUPABASE_URL")
+    _SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY")
+    _TABLE = os.getenv("SUPABASE_TABLE", "llm_interactions")
+    SUPABASE_READY = bool(_SUPABASE_URL and _SUPABASE_KEY and _TABLE)
+    if not _SUPABASE_URL:
+        SUPABASE_CONFIG_ERROR = "SUPABASE_URL environment variable is not set"
+    elif not _SUPABASE_KEY:
+        SUPABASE_CONFIG_ERROR = "SUPABASE_SERVICE_ROLE or SUPABASE_ANON_KEY environment variable is not set"
+    elif not _TABLE:
+        SUPABASE_CONFIG_ERROR = "SUPABASE_TABLE environment variable is not set"
+    else:
+        SUPABASE_CONFIG_ERROR = None
+    SUPABASE_IDEMPOTENCY_KEYS = os.getenv("SUPABASE_IDEMPOTENCY_KEYS", "false").lower() in ("1", "true", "yes")
+
+    base = (_SUPABASE_URL or "").rstrip("/") + "/rest/v1/"
+    _ENDPOINT = base + _TABLE
+    _PDF_CACHE_ENDPOINT = base + os.getenv("SUPABASE_PDF_CACHE_TABLE", "pdf_cache")
+    transcripts_table = os.getenv("SUPABASE_TRANSCRIPTS_TABLE", "")
+    _TRANSCRIPTS_ENDPOINT = base + transcripts_table
+    TRANSCRIPT_STORE_READY = SUPABASE_READY and bool(transcripts_table)
+
+    auth = {"apikey": _SUPABASE_KEY or "", "Authorization": f"Bearer {_SUPABASE_KEY}"}
+    _READ_HEADERS = {**auth, "Accept": "application/json"}
+    # Nothing reads inserted rows back, so skip RETURNING and the response body
+    _INSERT_HEADERS = {**auth, "Content-Type": "application/json", "Prefer": "return=minimal"}
+    _INSERT_PARAMS = {}
+    if SUPABASE_IDEMPOTENCY_KEYS:
+        # INSERT ... ON CONFLICT (idempotency_key) DO NOTHING
+        _INSERT_HEADERS["Prefer"] = "resolution=ignore-duplicates,return=minimal"
+        _INSERT_PARAMS = {"on_conflict": "idempotency_key"}
+    # Don't send deleted rows back; the count comes from Content-Range
+    _DELETE_HEADERS = {**auth, "Prefer": "return=minimal,count=exact"}
+    # Upsert on the primary key; nothing needs to come back
+    _UPSERT_HEADERS = {
+        **auth,
+        "Content-Type": "application/json",
+        "Prefer": "resolution=merge-duplicates,return=minimal",
+    }
+    # Insert unless the primary key already exists (content-addressed rows never change)
+    _IGNORE_DUPLICATES_HEADERS = {
+        **auth,
+        "Content-Type": "application/json",
+        "Prefer": "resolution=ignore-duplicates,return=minimal",
+    }
+
+
+_refresh_config()
+
+# Default projection for interaction reads: row metadata only, no multi-KB JSONB payloads
+INTERACTION_META_COLUMNS = "id,route,model,created_at"
+# What the frontend feed renders (input/output for the cards and detail view)
+FEED_COLUMNS = "id,route,created_at,input,output"
+
+
+def _dumps(value: Any) -> bytes:
+    """Serialize a request body once, to compact JSON bytes (sent as `content=`)."""
+    if orjson is not None:
+        return orjson.dumps(value)
+    return json.dumps(value, separators=(",", ":")).encode("utf-8")
+
+
+class SupabaseError(Exception):
+    """A Supabase request failed (HTTP error status or transport error)."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class SupabaseRateLimited(SupabaseError):
+    """Supabase answered 429; retry_after is the server's Retry-After in seconds, if sent."""
+
+    def __init__(self, message: str, retry_after: Optional[float] = None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+class SupabaseTimeout(SupabaseError):
+    """The Supabase request timed out."""
+
+
+def _loads(content: bytes) -> Any:
+    """Parse a response body straight from bytes (orjson skips the str decode step)."""
+    return orjson.loads(content) if orjson is not None else json.loads(content)
+
+# Background writer for fire-and-forget interaction logs (see enqueue_interaction):
+# rows are queued in-process and inserted in batches of up to LOG_BATCH_MAX_ROWS,
+# waiting at most LOG_BATCH_MAX_MS for a batch to fill (a lone row is written immediately).
+LOG_QUEUE_MAXSIZE = 10_000
+LOG_BATCH_MAX_ROWS = max(1, int(os.getenv("SUPABASE_BATCH_SIZE", "100")))
+LOG_BATCH_MAX_MS = max(0, int(os.getenv("SUPABASE_BATCH_MS", "200")))
+# Transient failures (network errors, 429, 5xx) are retried with jittered exponential
+# backoff, waiting for the server's Retry-After instead when it sends one
+LOG_INSERT_ATTEMPTS = 3
+LOG_RETRY_BASE_DELAY = 0.5
+
+_log_queue: Optional["asyncio.Queue[Dict[str, Any]]"] = None
+_log_writer_task: Optional[asyncio.Task] = None
+
+# One pooled client for every Supabase call, so requests reuse keep-alive
+# connections instead of paying a TCP+TLS handshake each time.
+SUPABASE_MAX_CONNECTIONS = int(os.getenv("SUPABASE_MAX_CONNECTIONS", "100"))
+SUPABASE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("SUPABASE_MAX_KEEPALIVE_CONNECTIONS", "20"))
+
+# HTTP/2 lets concurrent calls share one multiplexed connection; needs the optional h2 package
+_HTTP2 = importlib.util.find_spec("h2") is not None
+
+_client: Optional[httpx.AsyncClient] = None
+
+
+def _get_client() -> httpx.AsyncClient:
+    """Return the process-wide Supabase HTTP client, creating it on first use."""
+    global _client
+    if _client is None or _client.is_closed:
+        _client = httpx.AsyncClient(
+            http2=_HTTP2,
+            timeout=10.0,
+            limits=httpx.Limits(
+                max_connections=SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=30.0,
+            ),
+        )
+    return _client
+
+
+async def close_client() -> None:
+    """Close the shared Supabase HTTP client (call on app shutdown, after stop_log_writer)."""
+    global _client
+    if _client is not None:
+        await _client.aclose()
+        _client = None
+
+
+async def _request(method: str, url: str, action: str, **kwargs: Any) -> httpx.Response:
+    """Send one Supabase REST request; returns the 2xx response.
+
+    Raises:
+        SupabaseRateLimited: Supabase answered 429 (carries Retry-After)
+        SupabaseTimeout: The request timed out
+        SupabaseError: Any other error status, or a transport error
+    """
+    try:
+        response = await _get_client().request(method, url, **kwargs)
+    except httpx.TimeoutException as e:
+        raise SupabaseTimeout(f"Supabase {action} timed out: {e!r}") from e
+    except httpx.HTTPError as e:
+        raise SupabaseError(f"Supabase {action} failed: {e!r}") from e
+    if response.status_code == 429:
+        raise SupabaseRateLimited(
+            f"Supabase {action} was rate limited", retry_after=retry_after_seconds(response.headers)
+        )
+    if response.status_code >= 400:
+        raise SupabaseError(
+            f"Supabase {action} returned status {response.status_code}: {response.text[:200]}",
+            status_code=response.status_code,
+        )
+    return response
+
+
+def _build_row(
     route: str,
     input_payload: Dict[str, Any],
     output_payload: Dict[str, Any],
     model: Optional[str] = None,
     extra: Optional[Dict[str, Any]] = None,
-) -> None:
+    idempotency_key: Optional[str] = None,
+) -> Dict[str, Any]:
+    """Build the llm_interactions row for one LLM call."""
+    row: Dict[str, Any] = {
+        "route": route,
+        "model": model or GROQ_MODEL,
+        "input": input_payload,
+        "output": output_payload,
+    }
+    # Merge any additional fields
+    if extra:
+        row.update(extra)
+    if SUPABASE_IDEMPOTENCY_KEYS:
+        # One key per job (not a content hash): a deliberate re-submission of the same
+        # input is a new interaction and must not be dropped as a duplicate
+        row["idempotency_key"] = idempotency_key or uuid.uuid4().hex
+    return row
+
+
+def enqueue_interaction(
+    route: str,
+    input_payload: Dict[str, Any],
+    output_payload: Dict[str, Any],
+    model: Optional[str] = None,
+    extra: Optional[Dict[str, Any]] = None,
+    idempotency_key: Optional[str] = None,
+) -> bool:
     """
-    Persist an LLM interaction to Supabase REST API.
+    Queue an LLM interaction row for the background batch writer (Supabase REST API).
     
-    CRITICAL CHANGE: Now raises exceptions instead of silently failing.
-    This ensures the caller (task processor) knows if logging failed and can retry.
+    This never waits on Supabase and never raises: logging is best-effort metadata
+    off the request path. The writer task is started at app startup (or on first use)
+    and drained on shutdown (stop_log_writer).
     
     Configuration via environment variables:
       - SUPABASE_URL: e.g. https://<project>.supabase.co
@@ -36,74 +277,200 @@ async def log_interaction(
         output_payload: Dictionary of output/result from LLM
         model: Name of the LLM model used (defaults to GROQ_MODEL env var)
         extra: Optional additional fields to store (e.g., company, name)
+        idempotency_key: Per-job key (e.g. the QStash message id), so a redelivered job's
+            row is inserted once when SUPABASE_IDEMPOTENCY_KEYS is on; random if omitted
     
-    Raises:
-        Exception: If Supabase is not configured or request fails
+    Returns:
+        True if the row was queued, False if it was dropped because the queue is full.
     """
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY")
-    table = os.getenv("SUPABASE_TABLE", "llm_interactions")
+    start_log_writer()
+    assert _log_queue is not None
+    try:
+        _log_queue.put_nowait(_build_row(route, input_payload, output_payload, model, extra, idempotency_key))
+        return True
+    except asyncio.QueueFull:
+        logger.warning("Interaction log queue full, dropping row for %s", route)
+        return False
 
-    # CRITICAL: Raise exception if not configured (instead of silent return)
-    if not supabase_url:
-        raise Exception("SUPABASE_URL environment variable is not set")
-    if not supabase_key:
-        raise Exception("SUPABASE_SERVICE_ROLE or SUPABASE_ANON_KEY environment variable is not set")
-    if not table:
-        raise Exception("SUPABASE_TABLE environment variable is not set")
 
-    # Build REST API endpoint
-    endpoint = supabase_url.rstrip("/") + f"/rest/v1/{table}"
+def start_log_writer() -> None:
+    """Create the log queue and start the background writer task, if not already running."""
+    global _log_queue, _log_writer_task
+    if _log_queue is None:
+        _log_queue = asyncio.Queue(maxsize=LOG_QUEUE_MAXSIZE)
+    if _log_writer_task is None or _log_writer_task.done():
+        _log_writer_task = asyncio.create_task(_log_writer_loop())
 
-    # Build row data to insert
-    payload: Dict[str, Any] = {
-        "route": route,
-        "model": model or os.getenv("GROQ_MODEL"),
-        "input": input_payload,
-        "output": output_payload,
-    }
-    
-    # Merge any additional fields
-    if extra:
-        payload.update(extra)
 
-    # Set up authentication headers
-    headers = {
-        "apikey": supabase_key,
-        "Authorization": f"Bearer {supabase_key}",
-        "Content-Type": "application/json",
-        # Request the inserted row back (useful for debugging, can be removed)
-        "Prefer": "return=representation",
-    }
+async def stop_log_writer(timeout: float = 10.0) -> None:
+    """Flush queued interaction rows (up to `timeout` seconds), then stop the writer task."""
+    global _log_queue, _log_writer_task
+    if _log_writer_task is None:
+        return
+    if _log_queue is not None and not _log_writer_task.done():
+        try:
+            await asyncio.wait_for(_log_queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Dropping %s unflushed interaction log rows", _log_queue.qsize())
+    _log_writer_task.cancel()
+    _log_writer_task = None
+    # The queue belongs to this event loop; a later start_log_writer gets a fresh one
+    _log_queue = None
+
+
+async def _log_writer_loop() -> None:
+    """Drain the log queue, inserting up to LOG_BATCH_MAX_ROWS rows per request."""
+    assert _log_queue is not None
+    while True:
+        batch = [await _log_queue.get()]
+        # A lone row (quiet period) is written right away so it reaches the feed without
+        # waiting out the window; rows arriving meanwhile batch up behind that insert.
+        # Under load, give the batch up to LOG_BATCH_MAX_MS to fill, then take whatever
+        # is queued. (Sleeping instead of wait_for(get()) keeps cancellation reliable.)
+        if 0 < _log_queue.qsize() < LOG_BATCH_MAX_ROWS - 1:
+            await asyncio.sleep(LOG_BATCH_MAX_MS / 1000)
+        while len(batch) < LOG_BATCH_MAX_ROWS and not _log_queue.empty():
+            batch.append(_log_queue.get_nowait())
+        try:
+            await _insert_rows(batch)
+        except Exception as e:
+            logger.exception("Failed to write %s interaction log rows: %s", len(batch), e)
+        finally:
+            for _ in batch:
+                _log_queue.task_done()
+
+
+async def _post_insert(body: Any) -> None:
+    """POST one insert body, retrying timeouts, transport errors, 429 and 5xx with jittered backoff.
+
+    Raises the SupabaseError of the final attempt; other 4xx errors are raised right away.
+    """
+    content = _dumps(body)
+
+    async def _post() -> None:
+        await _request(
+            "POST", _ENDPOINT, "insert", headers=_INSERT_HEADERS, params=_INSERT_PARAMS, content=content, timeout=10.0
+        )
+
+    for attempt in range(1, LOG_INSERT_ATTEMPTS):
+        try:
+            return await _post()
+        except SupabaseError as e:
+            if e.status_code is not None and e.status_code < 500 and not isinstance(e, SupabaseRateLimited):
+                raise
+            logger.warning("Supabase insert attempt %s/%s failed: %s", attempt, LOG_INSERT_ATTEMPTS, e)
+            await asyncio.sleep(backoff_delay(attempt - 1, LOG_RETRY_BASE_DELAY, retry_after_from_exception(e)))
+
+    # Final attempt: whatever it raises goes to the caller
+    await _post()
+
+
+def _is_rejected_row(error: SupabaseError) -> bool:
+    """A 4xx other than 429: the data was refused, so retrying the same body can't succeed."""
+    return error.status_code is not None and 400 <= error.status_code < 500 and error.status_code != 429
+
+
+async def _insert_rows(rows: List[Dict[str, Any]]) -> None:
+    """Bulk-insert rows into the interactions table (one POST per distinct column set)."""
+    if not SUPABASE_READY or not _TABLE:
+        logger.warning("Supabase not configured, dropping %s interaction log rows", len(rows))
+        return
+
+    # PostgREST bulk inserts need every object in the array to have the same keys,
+    # and 'extra' varies by caller, so group rows by their column set.
+    groups: Dict[tuple, List[Dict[str, Any]]] = {}
+    for row in rows:
+        groups.setdefault(tuple(sorted(row)), []).append(row)
+
+    for group in groups.values():
+        try:
+            await _post_insert(group)
+        except SupabaseError as e:
+            if not (_is_rejected_row(e) and len(group) > 1):
+                logger.warning("Supabase bulk insert of %s rows failed: %s", len(group), e)
+                continue
+            # A bulk insert is all-or-nothing: one bad row rejects the whole array.
+            # Retry row by row so only the offending row(s) are dropped (not when rate limited).
+            logger.warning("Supabase bulk insert of %s rows failed (%s), retrying row by row", len(group), e)
+            inserted = 0
+            for row in group:
+                try:
+                    await _post_insert(row)
+                except SupabaseError as row_error:
+                    logger.warning("Supabase insert for %s failed: %s", row.get("route"), row_error)
+                else:
+                    inserted += 1
+            if inserted:
+                list_cache.clear()
+                logger.info("Logged %s of %s interactions to Supabase", inserted, len(group))
+        else:
+            list_cache.clear()
+            logger.info("Logged %s interactions to Supabase", len(group))
+
+
+# Timestamps as PostgREST returns them, e.g. 2025-01-01T09:30:00.123456+00:00
+_CURSOR_TIMESTAMP_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:\.\d{1,6})?(?:Z|[+-]\d{2}(?::?\d{2})?)?"
+)
+
 
-    # CRITICAL: Propagate exceptions instead of swallowing them
+def encode_cursor(created_at: str, row_id: Any) -> str:
+    """Opaque keyset cursor for the row (created_at, id), safe to pass in a query string."""
+    raw = f"{created_at},{row_id}".encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Tuple[str, str]:
+    """(created_at, id) from a cursor made by encode_cursor; ValueError if it is malformed.
+
+    Cursors come from clients and their values are spliced into a PostgREST filter, so
+    created_at must be an ISO timestamp and id a UUID (or integer id); nothing else passes.
+    """
     try:
-        async with httpx.AsyncClient(timeout=10.0) as client:
-            response = await client.post(endpoint, headers=headers, json=payload)
-            
-            # Check for HTTP errors
-            if response.status_code >= 400:
-                error_detail = response.text[:200]  # Truncate long error messages
-                raise Exception(
-                    f"Supabase insert failed with status {response.status_code}: {error_detail}"
-                )
-            
-            print(f"[INFO] Successfully logged interaction to Supabase: {route}")
-            
-    except httpx.TimeoutException as e:
-        raise Exception(f"Supabase request timed out: {str(e)}")
-    except httpx.RequestError as e:
-        raise Exception(f"Supabase request failed: {str(e)}")
-    except Exception as e:
-        # Re-raise with context
-        raise Exception(f"Failed to log to Supabase: {str(e)}")
+        raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+    except (binascii.Error, UnicodeDecodeError) as e:
+        raise ValueError("Invalid cursor") from e
+    created_at, sep, row_id = raw.partition(",")
+    if not sep or not _CURSOR_TIMESTAMP_RE.fullmatch(created_at):
+        raise ValueError("Invalid cursor")
+    if not row_id.isdigit():
+        try:
+            row_id = str(uuid.UUID(row_id))
+        except ValueError as e:
+            raise ValueError("Invalid cursor") from e
+    return created_at, row_id
+
+
+def _paginate(params: Dict[str, str], offset: int, before: Optional[str]) -> None:
+    """Add the page position to list query params: a keyset cursor if given, else an offset."""
+    if before:
+        # Keyset on (created_at, id), the same key as the ORDER BY, so rows sharing a
+        # created_at are neither skipped nor repeated across pages. It uses the index,
+        # so deep pages cost the same as the first one (OFFSET scans and discards rows).
+        created_at, row_id = decode_cursor(before)
+        params["or"] = (
+            f'(created_at.lt."{created_at}",and(created_at.eq."{created_at}",id.lt."{row_id}"))'
+        )
+    else:
+        params["offset"] = str(max(0, offset))  # Ensure non-negative
+
+
+def next_cursor(rows: List[Dict[str, Any]], limit: int) -> Optional[str]:
+    """Cursor for the page after `rows` (pass back as `before`), or None on the last page."""
+    if not rows or len(rows) < limit:
+        return None
+    last = rows[-1]
+    if last.get("created_at") is None or last.get("id") is None:
+        return None
+    return encode_cursor(last["created_at"], last["id"])
 
 
 async def fetch_interactions(
     route: str,
     limit: int = 20,
     offset: int = 0,
-    select: str = "*",
+    select: str = INTERACTION_META_COLUMNS,
+    before: Optional[str] = None,
 ):
     """
     Fetch interactions from Supabase REST API for a given route.
@@ -111,60 +478,92 @@ async def fetch_interactions(
     Uses Supabase query parameters to filter, sort, and paginate results:
     - Filters by exact route match
     - Orders by created_at descending (newest first)
-    - Limits and offsets for pagination
+    - Limits, plus keyset (`before`) or offset pagination
     
     Args:
         route: API endpoint to filter by (e.g., "/api/v1/analyze-transcript")
         limit: Maximum number of records to return (capped at 1000, default: 20)
-        offset: Number of records to skip for pagination (default: 0)
-        select: Columns to return (default: "*" for all columns)
+        offset: Number of records to skip for pagination (default: 0; ignored when `before` is set)
+        select: Columns to return (default: metadata only; pass FEED_COLUMNS or "*" for payloads)
+        before: Keyset cursor from next_cursor: only rows after that (created_at, id) position
     
     Returns:
-        List of interaction records (each as a dict), or empty list on error/misconfig.
-        Each record contains: id, route, model, input, output, created_at, etc.
+        List of interaction records (each as a dict), or empty list on a SupabaseError/misconfig.
+        Each record contains the columns named in `select`.
     """
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY")
-    table = os.getenv("SUPABASE_TABLE", "llm_interactions")
-
     # Return empty list if not configured (best-effort read)
-    if not supabase_url or not supabase_key or not table:
-        print("[WARN] Supabase not configured, returning empty list")
+    if not SUPABASE_READY or not _TABLE:
+        logger.warning("Supabase not configured, returning empty list")
         return []
 
-    endpoint = supabase_url.rstrip("/") + f"/rest/v1/{table}"
-    
-    headers = {
-        "apikey": supabase_key,
-        "Authorization": f"Bearer {supabase_key}",
-        "Accept": "application/json",
-    }
-
     # Build query parameters for filtering, sorting, pagination
     params = {
         "select": select,
         "route": f"eq.{route}",  # Filter: route equals the provided value
-        "order": "created_at.desc",  # Sort: newest first
+        "order": "created_at.desc,id.desc",  # Sort: newest first (id breaks ties)
         "limit": str(max(0, min(1000, limit))),  # Clamp between 0-1000
-        "offset": str(max(0, offset)),  # Ensure non-negative
     }
+    _paginate(params, offset, before)
 
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            response = await client.get(endpoint, headers=headers, params=params)
-            
-            # Return parsed JSON if successful
-            if response.status_code >= 200 and response.status_code < 300:
-                data = response.json()
-                print(f"[INFO] Fetched {len(data)} interactions from Supabase")
-                return data
-            else:
-                print(f"[WARN] Supabase fetch returned status {response.status_code}")
-                
-    except Exception as e:
-        print(f"[ERROR] Failed to fetch interactions: {e}")
-    
-    return []
+        response = await _request("GET", _ENDPOINT, "fetch", headers=_READ_HEADERS, params=params, timeout=8.0)
+    except SupabaseError as e:
+        logger.error("Failed to fetch interactions: %s", e)
+        return []
+
+    data = _loads(response.content)
+    logger.info("Fetched %s interactions from Supabase", len(data))
+    return data
+
+
+async def fetch_interactions_multi(
+    routes: List[str],
+    limit: int = 20,
+    offset: int = 0,
+    select: str = INTERACTION_META_COLUMNS,
+    before: Optional[str] = None,
+):
+    """
+    Fetch interactions for several routes in a single Supabase query.
+    
+    Filtering, ordering and pagination all happen in Postgres
+    (route IN (...) ORDER BY created_at DESC LIMIT, keyset or OFFSET), so only the
+    requested page is transferred and no merge/sort is needed in Python.
+    
+    Args:
+        routes: API endpoints to include (e.g., ["/api/v1/generate-icebreaker", ...])
+        limit: Maximum number of records to return (capped at 1000, default: 20)
+        offset: Number of records to skip for pagination (default: 0; ignored when `before` is set)
+        select: Columns to return (default: metadata only; pass FEED_COLUMNS or "*" for payloads)
+        before: Keyset cursor from next_cursor: only rows after that (created_at, id) position
+    
+    Returns:
+        List of interaction records (each as a dict), or empty list on a SupabaseError/misconfig.
+    """
+    # Return empty list if not configured (best-effort read)
+    if not SUPABASE_READY or not _TABLE or not routes:
+        logger.warning("Supabase not configured, returning empty list")
+        return []
+
+    # Quote each value so PostgREST treats '/' and '-' in routes literally
+    route_list = ",".join(f'"{r}"' for r in routes)
+    params = {
+        "select": select,
+        "route": f"in.({route_list})",  # Filter: route is any of the provided values
+        "order": "created_at.desc,id.desc",  # Sort: newest first (id breaks ties)
+        "limit": str(max(0, min(1000, limit))),  # Clamp between 0-1000
+    }
+    _paginate(params, offset, before)
+
+    try:
+        response = await _request("GET", _ENDPOINT, "fetch", headers=_READ_HEADERS, params=params, timeout=8.0)
+    except SupabaseError as e:
+        logger.error("Failed to fetch interactions: %s", e)
+        return []
+
+    data = _loads(response.content)
+    logger.info("Fetched %s interactions from Supabase", len(data))
+    return data
 
 
 async def delete_interaction_by_id(row_id: str) -> int:
@@ -175,52 +574,158 @@ async def delete_interaction_by_id(row_id: str) -> int:
         row_id: Unique identifier of the row to delete (UUID string)
     
     Returns:
-        Number of rows deleted (0 or 1). Returns 0 on error/misconfig.
+        Number of rows deleted (0 or 1). Returns 0 on a SupabaseError/misconfig.
     """
-    supabase_url = os.getenv("SUPABASE_URL")
-    supabase_key = os.getenv("SUPABASE_SERVICE_ROLE") or os.getenv("SUPABASE_ANON_KEY")
-    table = os.getenv("SUPABASE_TABLE", "llm_interactions")
-
-    # Return 0 if not configured or invalid ID
-    if not supabase_url or not supabase_key or not table or not row_id:
-        print("[WARN] Supabase not configured or invalid row_id, cannot delete")
+    if not row_id:
+        logger.warning("Invalid row_id, cannot delete")
         return 0
+    return await delete_interactions_by_ids([row_id])
 
-    endpoint = supabase_url.rstrip("/") + f"/rest/v1/{table}"
+
+async def delete_interactions_by_ids(row_ids: List[str]) -> int:
+    """
+    Delete several interaction rows in one request (DELETE ... WHERE id IN (...)).
     
-    headers = {
-        "apikey": supabase_key,
-        "Authorization": f"Bearer {supabase_key}",
-        "Accept": "application/json",
-        # Return deleted rows so we can count them
-        "Prefer": "return=representation",
+    Args:
+        row_ids: Unique identifiers of the rows to delete (UUID strings)
+    
+    Returns:
+        Number of rows deleted. Returns 0 on a SupabaseError/misconfig.
+    """
+    row_ids = [row_id for row_id in row_ids if row_id]
+    # Return 0 if not configured or nothing to delete
+    if not SUPABASE_READY or not _TABLE or not row_ids:
+        logger.warning("Supabase not configured or no row ids, cannot delete")
+        return 0
+
+    # Filter by ID; one round trip however many rows (quoted, like the route filter)
+    id_list = ",".join(f'"{row_id}"' for row_id in row_ids)
+    params = {
+        "id": f"in.({id_list})",
     }
+    label = f"id={row_ids[0]}" if len(row_ids) == 1 else f"{len(row_ids)} ids"
+
+    try:
+        response = await _request("DELETE", _ENDPOINT, "delete", headers=_DELETE_HEADERS, params=params, timeout=8.0)
+    except SupabaseError as e:
+        logger.error("Failed to delete interactions: %s", e)
+        return 0
+
+    list_cache.clear()
+    # Content-Range looks like "*/1" (count of deleted rows)
+    total = response.headers.get("content-range", "").rpartition("/")[2]
+    if total.isdigit():
+        deleted_count = int(total)
+        logger.info("Deleted %s interaction(s) with %s", deleted_count, label)
+        return deleted_count
+    # No count in the response: infer success but can't confirm count
+    logger.info("Delete request succeeded for %s (count unknown)", label)
+    return len(row_ids)
+
+
+async def fetch_pdf_cache(pdf_hash: str) -> Optional[Dict[str, Any]]:
+    """
+    Look up previously extracted text/summary for a PDF by its content hash.
+    
+    Best-effort read: a missing table or misconfiguration is treated as a cache miss.
     
-    # Filter by exact ID match
+    Configuration via environment variables:
+      - SUPABASE_PDF_CACHE_TABLE (default: pdf_cache)
+    
+    Args:
+        pdf_hash: Hex MD5 digest of the uploaded PDF bytes
+    
+    Returns:
+        Row dict with 'extracted_text' and 'deck_summary', or None on miss/error.
+    """
+    if not SUPABASE_READY or not pdf_hash:
+        return None
+
     params = {
-        "id": f"eq.{row_id}",
+        "select": "extracted_text,deck_summary",
+        "hash": f"eq.{pdf_hash}",
+        "limit": "1",
     }
 
     try:
-        async with httpx.AsyncClient(timeout=8.0) as client:
-            response = await client.delete(endpoint, headers=headers, params=params)
-            
-            if response.status_code >= 200 and response.status_code < 300:
-                try:
-                    data = response.json()
-                    # Count deleted rows from response
-                    if isinstance(data, list):
-                        deleted_count = len(data)
-                        print(f"[INFO] Deleted {deleted_count} interaction(s) with id={row_id}")
-                        return deleted_count
-                except Exception:
-                    # If minimal/no body, infer success but can't confirm count
-                    print(f"[INFO] Delete request succeeded for id={row_id} (count unknown)")
-                    return 1
-            else:
-                print(f"[WARN] Delete request returned status {response.status_code}")
-                
-    except Exception as e:
-        print(f"[ERROR] Failed to delete interaction: {e}")
-    
-    return 0
\ No newline at end of file
+        response = await _request(
+            "GET", _PDF_CACHE_ENDPOINT, "PDF cache lookup", headers=_READ_HEADERS, params=params, timeout=8.0
+        )
+    except SupabaseError as e:
+        logger.error("Failed to look up PDF cache: %s", e)
+        return None
+
+    data = _loads(response.content)
+    if data:
+        logger.info("PDF cache hit for %s", pdf_hash)
+        return data[0]
+    return None
+
+
+async def upsert_pdf_cache(pdf_hash: str, extracted_text: str, deck_summary: Optional[str] = None) -> None:
+    """
+    Store (or refresh) the extracted text/summary for a PDF content hash.
+    
+    Best-effort write: Supabase errors are logged, never raised.
+    
+    Args:
+        pdf_hash: Hex MD5 digest of the uploaded PDF bytes (primary key)
+        extracted_text: Text extracted from the PDF
+        deck_summary: Groq summary of the deck, if one was generated
+    """
+    if not SUPABASE_READY or not pdf_hash:
+        return
+
+    payload = {"hash": pdf_hash, "extracted_text": extracted_text, "deck_summary": deck_summary}
+
+    try:
+        await _request(
+            "POST",
+            _PDF_CACHE_ENDPOINT,
+            "PDF cache upsert",
+            headers=_UPSERT_HEADERS,
+            params={"on_conflict": "hash"},
+            content=_dumps(payload),
+            timeout=10.0,
+        )
+    except SupabaseError as e:
+        logger.error("Failed to upsert PDF cache: %s", e)
+
+
+async def store_transcript(transcript_hash: str, text: str) -> bool:
+    """
+    Store a transcript once under its content hash, so interaction rows can reference it.
+    
+    A transcript that is already stored is left as is (ON CONFLICT DO NOTHING), so
+    re-submitting the same transcript costs one small round-trip and no new row.
+    Best-effort: Supabase errors are logged, never raised.
+    
+    Configuration via environment variables:
+      - SUPABASE_TRANSCRIPTS_TABLE (unset: disabled, transcripts stay inline in the log row)
+    
+    Args:
+        transcript_hash: Hex SHA-256 digest of the transcript text (primary key)
+        text: Transcript text
+    
+    Returns:
+        True if the transcript is stored (now or previously), False otherwise.
+    """
+    if not TRANSCRIPT_STORE_READY or not transcript_hash:
+        return False
+
+    payload = {"hash": transcript_hash, "text": text}
+
+    try:
+        await _request(
+            "POST",
+            _TRANSCRIPTS_ENDPOINT,
+            "transcript store",
+            headers=_IGNORE_DUPLICATES_HEADERS,
+            params={"on_conflict": "hash"},
+            content=_dumps(payload),
+            timeout=10.0,
+        )
+    except SupabaseError as e:
+        logger.error("Failed to store transcript: %s", e)
+        return False
+    return True
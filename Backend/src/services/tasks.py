@@ -1,33 +1,135 @@
 import os
+import json
+import logging
+import uuid
 import asyncio
-from typing import Any, Dict
+import hashlib
+from typing import Any, Dict, List, Optional, Set, Tuple
 
 from fastapi import HTTPException
-import openai
 import re
 from dotenv import load_dotenv
 
-from src.services.supabase_logger import log_interaction
+from src.services.supabase_logger import enqueue_interaction, store_transcript
+from src.services.groq_client import GROQ_MODEL, get_async_groq_client
+from src.services import llm_cache, supabase_logger
+from src.services.backoff import backoff_delay, retry_after_from_exception
 
 load_dotenv()
 
+logger = logging.getLogger(__name__)
 
-def _groq_client():
-    """Initialize and return a Groq API client configured with environment credentials."""
-    return openai.OpenAI(
-        base_url="https://api.groq.com/openai/v1",
-        api_key=os.getenv("GROQ_API_KEY"),
+# Micro-batching of icebreaker completions (see _CompletionBatcher). A max size of 1 disables it.
+GROQ_BATCH_MAX_SIZE = int(os.getenv("GROQ_BATCH_MAX_SIZE", "1"))
+GROQ_BATCH_WINDOW_MS = float(os.getenv("GROQ_BATCH_WINDOW_MS", "20"))
+
+# Groq Batch API for bulk/offline jobs submitted with mode="batch" (see enqueue_batch_job)
+GROQ_BATCH_API_MAX_JOBS = int(os.getenv("GROQ_BATCH_API_MAX_JOBS", "50"))
+GROQ_BATCH_API_FLUSH_SECONDS = float(os.getenv("GROQ_BATCH_API_FLUSH_SECONDS", "5"))
+GROQ_BATCH_API_POLL_SECONDS = float(os.getenv("GROQ_BATCH_API_POLL_SECONDS", "30"))
+GROQ_BATCH_API_TIMEOUT_MINUTES = float(os.getenv("GROQ_BATCH_API_TIMEOUT_MINUTES", "60"))
+
+# Cap on transcript characters sent to the LLM (0 disables). Longer transcripts first lose
+# standalone "um"/"uh" fillers, then keep the opening and the closing stretch (see _fit_transcript).
+MAX_PROMPT_CHARS = int(os.getenv("MAX_PROMPT_CHARS", "40000"))
+
+# Seconds of artificial delay per transcript job, for exercising the queue in testing; 0 (default) = none
+TASKS_ARTIFICIAL_DELAY = float(os.getenv("TASKS_ARTIFICIAL_DELAY", "0"))
+
+_TRANSCRIPT_SYSTEM_PROMPT = "You are an expert meeting coach."
+_ICEBREAKER_SYSTEM_PROMPT = "You are an expert sales copywriter."
+
+# Icebreaker post-processing patterns, compiled once at import (see _clean_icebreaker)
+_GREETING_RE = re.compile(r"^(dear|hi|hello)\b[^,]*,?\s*", re.IGNORECASE)
+_BRACKET_RE = re.compile(r"\[[^\]]+\]")
+# Standalone "um"/"uh" tokens dropped from over-long transcripts before truncating
+# (words that merely contain them, like "umbrella" or "uh-oh", are kept)
+_FILLER_RE = re.compile(r"(?<!\S)(?:um+|uh+),?(?=\s|$)[ \t]*", re.IGNORECASE)
+
+
+def _transcript_fields(payload: Dict[str, Any]) -> Dict[str, Any]:
+    """Normalize transcript job metadata (attendees may arrive as a list or a string)."""
+    attendees = payload.get("attendees")
+    if isinstance(attendees, list):
+        attendees_str = ", ".join([str(a) for a in attendees])
+    else:
+        attendees_str = (attendees or "").strip()
+    transcript = (payload.get("transcript") or "").strip()
+    return {
+        "name": (payload.get("name") or "").strip(),
+        "company": (payload.get("company") or "").strip(),
+        "attendees": attendees,
+        "attendees_str": attendees_str,
+        "date": (payload.get("date") or "").strip(),
+        "transcript": transcript,
+        # What the prompt actually carries (capped at MAX_PROMPT_CHARS)
+        "prompt_transcript": _fit_transcript(transcript),
+    }
+
+
+def _fit_transcript(text: str) -> str:
+    """Shrink a transcript to MAX_PROMPT_CHARS for the prompt; shorter ones are returned unchanged."""
+    if MAX_PROMPT_CHARS <= 0 or len(text) <= MAX_PROMPT_CHARS:
+        return text
+    text = _FILLER_RE.sub("", text)
+    if len(text) <= MAX_PROMPT_CHARS:
+        return text
+    # Openings and closings carry most of the signal (intros, decisions, next steps):
+    # keep the first 10% of the budget and fill the rest from the end
+    head = MAX_PROMPT_CHARS // 10
+    # Size the marker for the largest possible count; a budget too small to hold it gets a plain cut
+    marker_len = len(f"\n[... {len(text)} characters omitted ...]\n")
+    tail = MAX_PROMPT_CHARS - head - marker_len
+    if tail < 0:
+        return text[:MAX_PROMPT_CHARS]
+    marker = f"\n[... {len(text) - head - tail} characters omitted ...]\n"
+    return text[:head] + marker + text[len(text) - tail:]
+
+
+def _transcript_log_input(fields: Dict[str, Any]) -> Dict[str, Any]:
+    """Log row input for a transcript job; attendees are the same normalized string the prompt uses."""
+    input_payload = {
+        "name": fields["name"],
+        "company": fields["company"],
+        "attendees": fields["attendees_str"],
+        "date": fields["date"],
+        "transcript": fields["transcript"],
+    }
+    if len(fields["prompt_transcript"]) != len(fields["transcript"]):
+        # Keep the cut auditable; the full text is still what gets logged
+        input_payload["transcript_chars"] = {
+            "original_len": len(fields["transcript"]),
+            "sent_len": len(fields["prompt_transcript"]),
+        }
+    return input_payload
+
+
+def _transcript_hash(text: str) -> str:
+    """Key of a transcript in the transcripts table."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def _transcript_prompt(fields: Dict[str, Any]) -> str:
+    """Build the meeting-coach prompt from normalized transcript fields."""
+    return (
+        "Review the following meeting transcript and provide:"
+        "\n- What went well"
+        "\n- What could be improved"
+        "\n- Actionable recommendations for next time"
+        "\nBe concise, specific, and reference quotes when appropriate.\n\n"
+        f"Company: {fields['company']}\nAttendees: {fields['attendees_str']}\nDate: {fields['date']}\n\n"
+        f"Transcript:\n{fields['prompt_transcript']}"
     )
 
 
-async def process_transcript(payload: Dict[str, Any]) -> Dict[str, Any]:
+async def process_transcript(payload: Dict[str, Any], job_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Process a meeting transcript using LLM to generate insights.
     
     This function:
     1. Extracts metadata (name, company, attendees, date) from payload
     2. Sends transcript to LLM for analysis (what went well, improvements, recommendations)
-    3. Logs the interaction to Supabase for persistence
+    3. Queues the interaction for the background Supabase log writer
     4. Returns structured result with type and content
     
     Args:
@@ -37,6 +139,8 @@ async def process_transcript(payload: Dict[str, Any]) -> Dict[str, Any]:
             - attendees: List or comma-separated string of attendees
             - date: Meeting date
             - transcript: Raw transcript text
+        job_key: Identifier of this job (e.g. the QStash message id), used as the log row's
+            idempotency key so a redelivered job is logged once; a fresh one if omitted
     
     Returns:
         Dict with 'type' and 'result' keys containing the LLM analysis
@@ -44,98 +148,82 @@ async def process_transcript(payload: Dict[str, Any]) -> Dict[str, Any]:
     Raises:
         HTTPException: If LLM call fails after 3 retries or unexpected response format
     """
-    # Artificial delay to simulate heavy processing and test queue behavior
-    await asyncio.sleep(1)
+    # Optional artificial delay to simulate heavy processing and test queue behavior
+    if TASKS_ARTIFICIAL_DELAY > 0:
+        await asyncio.sleep(TASKS_ARTIFICIAL_DELAY)
+
+    # One key per job, fixed before the retry loop, so only repeats of this job are deduplicated
+    job_key = job_key or uuid.uuid4().hex
     
     # Extract and normalize metadata from payload
-    name = (payload.get("name") or "").strip()
-    company = (payload.get("company") or "").strip()
-    attendees = payload.get("attendees")
-    
-    # Handle attendees as either list or string
-    if isinstance(attendees, list):
-        attendees_str = ", ".join([str(a) for a in attendees])
-    else:
-        attendees_str = (attendees or "").strip()
-    
-    date_str = (payload.get("date") or "").strip()
-    transcript_text = (payload.get("transcript") or "").strip()
+    fields = _transcript_fields(payload)
+    name = fields["name"]
+    company = fields["company"]
+    transcript_text = fields["transcript"]
 
-    # Build prompt for LLM analysis
-    prompt = (
-        "Review the following meeting transcript and provide:"
-        "\n- What went well"
-        "\n- What could be improved"
-        "\n- Actionable recommendations for next time"
-        "\nBe concise, specific, and reference quotes when appropriate.\n\n"
-        f"Company: {company}\nAttendees: {attendees_str}\nDate: {date_str}\n\n"
-        f"Transcript:\n{transcript_text}"
-    )
+    # Build prompt for LLM analysis (long transcripts are shrunk to MAX_PROMPT_CHARS)
+    prompt = _transcript_prompt(fields)
+
+    # Log row fields, built once up front rather than inside the retry loop
+    input_payload = _transcript_log_input(fields)
+    log_extra = {"company": company, "name": name}
+
+    client = get_async_groq_client()
+    messages = [
+        {"role": "system", "content": _TRANSCRIPT_SYSTEM_PROMPT},
+        {"role": "user", "content": prompt},
+    ]
+    model = GROQ_MODEL
 
-    client = _groq_client()
+    # Re-submitted transcripts are answered from the cache without another Groq call,
+    # and identical transcripts processed concurrently share a single call
+    cache_key = llm_cache.make_cache_key(model, messages, 0.3)
 
-    # Retry logic with exponential backoff
-    delay = 1.0
+    async def _analyze() -> str:
+        # Async SDK call: no worker-thread hop, and concurrent transcripts share the client's pool
+        completion = await asyncio.wait_for(
+            client.chat.completions.create(
+                messages=messages,
+                model=model,
+                temperature=0.3,
+            ),
+            timeout=120,
+        )
+        return completion.choices[0].message.content
+
+    # With a transcripts table configured, the text is stored once by hash and the log row
+    # only references it. The store doesn't depend on the LLM result, so it runs while the
+    # LLM call is in flight; if it fails the text stays inline in the log row.
+    store_task: Optional[asyncio.Task] = None
+    if supabase_logger.TRANSCRIPT_STORE_READY and transcript_text:
+        transcript_hash = _transcript_hash(transcript_text)
+        store_task = asyncio.create_task(store_transcript(transcript_hash, transcript_text))
+
+    # Retry with jittered exponential backoff (or the server's Retry-After when rate limited)
     last_exception = None
     
     for attempt in range(3):
         try:
-            # Run blocking SDK call in a worker thread to avoid blocking the event loop
-            completion = await asyncio.wait_for(
-                asyncio.to_thread(
-                    lambda: client.chat.completions.create(
-                        messages=[
-                            {"role": "system", "content": "You are an expert meeting coach."},
-                            {"role": "user", "content": prompt},
-                        ],
-                        model=os.getenv("GROQ_MODEL", "allam-2-7b"),
-                        temperature=0.3,
-                    )
-                ),
-                timeout=120,
-            )
-            
             # Extract content from LLM response
-            content = completion.choices[0].message.content
-            result = {"type": "transcript", "result": content}
-            
-            # CRITICAL: Log interaction with retry logic
-            # Attempt to log up to 3 times before giving up
-            log_success = False
-            log_delay = 0.5
-            
-            for log_attempt in range(3):
-                try:
-                    await log_interaction(
-                        route="/api/v1/analyze-transcript",
-                        input_payload={
-                            "name": name,
-                            "company": company,
-                            "attendees": attendees,
-                            "date": date_str,
-                            "transcript": transcript_text,
-                        },
-                        output_payload=result,
-                        model=os.getenv("GROQ_MODEL"),
-                        extra={"company": company, "name": name},
-                    )
-                    log_success = True
-                    break
-                except Exception as log_error:
-                    print(f"[WARN] Log attempt {log_attempt + 1}/3 failed: {log_error}")
-                    if log_attempt < 2:
-                        await asyncio.sleep(log_delay)
-                        log_delay *= 2
-                    else:
-                        # On final failure, raise to trigger main retry loop
-                        print(f"[ERROR] All Supabase logging attempts failed: {log_error}")
-                        raise HTTPException(
-                            status_code=500, 
-                            detail=f"Supabase logging failed after 3 attempts: {str(log_error)}"
-                        )
+            content, cached = await llm_cache.get_or_compute(cache_key, _analyze)
+            # Flag reused completions: at temperature 0.3 a fresh call could differ
+            result = {"type": "transcript", "result": content, "cached": cached}
+
+            if store_task is not None and await store_task:
+                del input_payload["transcript"]
+                input_payload["transcript_hash"] = transcript_hash
             
-            if not log_success:
-                raise HTTPException(status_code=500, detail="Failed to log interaction")
+            # Hand the row to the background log writer (batched, retried there);
+            # the job doesn't wait on Supabase and a logging outage doesn't fail it
+            if not enqueue_interaction(
+                route="/api/v1/analyze-transcript",
+                input_payload=input_payload,
+                output_payload=result,
+                model=GROQ_MODEL,
+                extra=log_extra,
+                idempotency_key=job_key,
+            ):
+                logger.error("Could not queue transcript log for %s", company or name)
             
             # Success - return result
             return result
@@ -144,18 +232,50 @@ async def process_transcript(payload: Dict[str, Any]) -> Dict[str, Any]:
             last_exception = e
             # On final attempt, raise the error
             if attempt == 2:
-                print(f"[ERROR] process_transcript failed after 3 attempts: {e}")
+                logger.error("process_transcript failed after 3 attempts: %s", e)
+                if store_task is not None:
+                    store_task.cancel()
                 raise
-            # Otherwise, wait and retry with exponential backoff
-            print(f"[WARN] process_transcript attempt {attempt + 1} failed: {e}. Retrying in {delay}s...")
+            # Otherwise, wait and retry after the backoff delay
+            delay = backoff_delay(attempt, 1.0, retry_after_from_exception(e))
+            logger.warning("process_transcript attempt %s failed: %s. Retrying in %.1fs...", attempt + 1, e, delay)
             await asyncio.sleep(delay)
-            delay *= 2
     
     # Fallback (should never reach here due to raise in loop)
     raise last_exception or HTTPException(status_code=500, detail="Unknown error in process_transcript")
 
 
-async def process_icebreaker(payload: Dict[str, Any]) -> Dict[str, Any]:
+def _icebreaker_prompt(linkedinBio: str, deckText: str) -> str:
+    """Build the icebreaker copywriting prompt from a LinkedIn bio and deck text."""
+    return (
+        "Using the following information, craft a personalized outreach icebreaker message."
+        "\nAnalyze the LinkedIn bio to understand the person's role, tone, interests, and goals."
+        "\nUse the sales deck to align the value proposition with their likely priorities or pain points."
+        "\nInclude:"
+        "\n- One personalized hook (based on something specific from their LinkedIn or company)."
+        "\n- One insight or observation linking their background to what the deck offers."
+        "\n- A natural transition line that sets up the conversation, without sounding salesy."
+        "\nEnd with a friendly question or soft CTA that encourages a reply."
+        "\n\nBe creative but authentic – sound like a human who did their homework."
+        "\n\nInputs:"
+        f"\nLinkedIn About Section:\n{linkedinBio}"
+        f"\n\nSales Deck Summary:\n{deckText}"
+    )
+
+
+def _clean_icebreaker(content: str) -> str:
+    """Strip whitespace runs, leading greetings and [placeholder] brackets from an icebreaker."""
+    # Remove excessive whitespace (str.split is several times faster than a \s+ regex)
+    content = " ".join(content.split())
+    
+    # Remove common greeting prefixes (Dear, Hi, Hello)
+    content = _GREETING_RE.sub("", content)
+    
+    # Remove placeholder brackets like [Company Name], [Your Name]
+    return _BRACKET_RE.sub("", content)
+
+
+async def process_icebreaker(payload: Dict[str, Any], job_key: Optional[str] = None) -> Dict[str, Any]:
     """
     Generate a personalized outreach icebreaker message using LinkedIn bio and sales deck.
     
@@ -163,112 +283,80 @@ async def process_icebreaker(payload: Dict[str, Any]) -> Dict[str, Any]:
     1. Extracts LinkedIn bio and sales deck text from payload
     2. Uses LLM to craft a personalized, authentic outreach message
     3. Cleans up formatting (removes greetings, placeholders, extra whitespace)
-    4. Logs the interaction to Supabase
+    4. Queues the interaction for the background Supabase log writer
     5. Returns the generated icebreaker
     
     Args:
         payload: Dictionary containing:
             - linkedinBio: LinkedIn "About" section text
             - deckText: Sales deck summary/content
+        job_key: Identifier of this job, used as the log row's idempotency key (see process_transcript)
     
     Returns:
         Dict with 'type' set to 'Icebreaker' and 'result' containing the message
     
     Raises:
-        HTTPException: If LLM call fails after 3 retries or logging fails
+        HTTPException: If LLM call fails after 3 retries
     """
     linkedinBio = payload.get("linkedinBio", "")
     deckText = payload.get("deckText", "")
+    job_key = job_key or uuid.uuid4().hex
 
     # Build prompt for personalized icebreaker generation
-    prompt = (
-        "Using the following information, craft a personalized outreach icebreaker message."
-        "\nAnalyze the LinkedIn bio to understand the person's role, tone, interests, and goals."
-        "\nUse the sales deck to align the value proposition with their likely priorities or pain points."
-        "\nInclude:"
-        "\n- One personalized hook (based on something specific from their LinkedIn or company)."
-        "\n- One insight or observation linking their background to what the deck offers."
-        "\n- A natural transition line that sets up the conversation, without sounding salesy."
-        "\nEnd with a friendly question or soft CTA that encourages a reply."
-        "\n\nBe creative but authentic – sound like a human who did their homework."
-        "\n\nInputs:"
-        f"\nLinkedIn About Section:\n{linkedinBio}"
-        f"\n\nSales Deck Summary:\n{deckText}"
-    )
+    prompt = _icebreaker_prompt(linkedinBio, deckText)
 
-    client = _groq_client()
+    client = get_async_groq_client()
 
-    # Retry logic with exponential backoff
-    delay = 1.0
+    # Retry with jittered exponential backoff (or the server's Retry-After when rate limited)
     last_exception = None
     
     for attempt in range(3):
         try:
-            # Call LLM (synchronous SDK call, no thread needed for icebreaker)
-            completion = client.chat.completions.create(
-                messages=[
-                    {"role": "system", "content": "You are an expert sales copywriter."},
-                    {"role": "user", "content": prompt},
-                ],
-                model=os.getenv("GROQ_MODEL", "allam-2-7b"),
-                temperature=0.3,
-            )
-            
-            # Extract and clean content
-            content = _extract_choice_content(completion)
-            
-            # Remove excessive whitespace
-            content = re.sub(r"\s+", " ", content).strip()
-            
-            # Remove common greeting prefixes (Dear, Hi, Hello)
-            content = re.sub(
-                r"^(dear|hi|hello)\b[^,]*,?\s*", "", content, flags=re.IGNORECASE
-            )
+            if GROQ_BATCH_MAX_SIZE > 1:
+                # Coalesce with other icebreakers arriving in the same window into one Groq call
+                # (same 120s cap as the direct call, so a stuck batch can't hang the request)
+                content = await asyncio.wait_for(_icebreaker_batcher.submit(prompt), timeout=120)
+            else:
+                # Async SDK call: the event loop keeps serving other requests during the round-trip
+                completion = await asyncio.wait_for(
+                    client.chat.completions.create(
+                        messages=[
+                            {"role": "system", "content": _ICEBREAKER_SYSTEM_PROMPT},
+                            {"role": "user", "content": prompt},
+                        ],
+                        model=GROQ_MODEL,
+                        temperature=0.3,
+                    ),
+                    timeout=120,
+                )
+                
+                # Extract and clean content
+                content = _extract_choice_content(completion)
             
-            # Remove placeholder brackets like [Company Name], [Your Name]
-            content = re.sub(r"\[[^\]]+\]", "", content)
+            content = _clean_icebreaker(content)
             
             response = {"type": "Icebreaker", "result": content}
             
-            # CRITICAL: Log interaction with retry logic
-            log_success = False
-            log_delay = 0.5
-            
-            for log_attempt in range(3):
-                try:
-                    await log_interaction(
-                        route="/api/v1/generate-icebreaker",
-                        input_payload={"linkedinBio": linkedinBio, "deckText": deckText},
-                        output_payload=response,
-                        model=os.getenv("GROQ_MODEL"),
-                    )
-                    log_success = True
-                    break
-                except Exception as log_error:
-                    print(f"[WARN] Log attempt {log_attempt + 1}/3 failed: {log_error}")
-                    if log_attempt < 2:
-                        await asyncio.sleep(log_delay)
-                        log_delay *= 2
-                    else:
-                        print(f"[ERROR] All Supabase logging attempts failed: {log_error}")
-                        raise HTTPException(
-                            status_code=500, 
-                            detail=f"Supabase logging failed after 3 attempts: {str(log_error)}"
-                        )
-            
-            if not log_success:
-                raise HTTPException(status_code=500, detail="Failed to log interaction")
+            # Hand the row to the background log writer (batched, retried there)
+            if not enqueue_interaction(
+                route="/api/v1/generate-icebreaker",
+                input_payload={"linkedinBio": linkedinBio, "deckText": deckText},
+                output_payload=response,
+                model=GROQ_MODEL,
+                idempotency_key=job_key,
+            ):
+                logger.error("Could not queue icebreaker log")
             
             return response
             
         except Exception as e:
             last_exception = e
             if attempt == 2:
-                print(f"[ERROR] process_icebreaker failed after 3 attempts: {e}")
+                logger.error("process_icebreaker failed after 3 attempts: %s", e)
                 raise
-            print(f"[WARN] process_icebreaker attempt {attempt + 1} failed: {e}. Retrying in {delay}s...")
+            delay = backoff_delay(attempt, 1.0, retry_after_from_exception(e))
+            logger.warning("process_icebreaker attempt %s failed: %s. Retrying in %.1fs...", attempt + 1, e, delay)
             await asyncio.sleep(delay)
-            delay *= 2
     
     raise last_exception or HTTPException(status_code=500, detail="Unknown error in process_icebreaker")
 
@@ -318,3 +406,314 @@ def _extract_choice_content(completion: Any) -> str:
         raise HTTPException(
             status_code=500, detail=f"Unexpected Groq response shape: {e}"
         )
+
+
+_BATCH_ROW_RE = re.compile(r"^###\s*Row\s+(\d+)\s*$", re.MULTILINE)
+
+
+class _CompletionBatcher:
+    """
+    Coalesce independent prompts that arrive within a short window into one Groq call.
+    
+    Each caller awaits `submit(prompt)`. A single consumer task drains up to
+    `max_size` queued prompts every `window_ms`, sends them as one numbered
+    multi-request prompt, and splits the reply back per row. If the reply
+    cannot be split cleanly, each prompt in the batch is sent on its own so
+    callers always get an answer to their own request.
+    
+    This trades a small latency floor (the window) for fewer requests against
+    the Groq RPM limit during bursts.
+    """
+
+    def __init__(self, system_prompt: str, temperature: float, max_size: int, window_ms: float):
+        self.system_prompt = system_prompt
+        self.temperature = temperature
+        self.max_size = max(1, max_size)
+        self.window = max(0.0, window_ms) / 1000.0
+        self._queue: Optional[asyncio.Queue] = None
+        self._worker: Optional[asyncio.Task] = None
+
+    async def submit(self, prompt: str) -> str:
+        loop = asyncio.get_running_loop()
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = loop.create_task(self._run())
+        future: asyncio.Future = loop.create_future()
+        await self._queue.put((prompt, future))
+        return await future
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.window
+            while len(batch) < self.max_size:
+                remaining = deadline - loop.time()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout=remaining))
+                except asyncio.TimeoutError:
+                    break
+            await self._dispatch(batch)
+
+    async def _dispatch(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        prompts = [prompt for prompt, _ in batch]
+        try:
+            if len(prompts) == 1:
+                results = [await self._complete(prompts[0])]
+            else:
+                results = await self._complete_batch(prompts)
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+    async def _complete(self, prompt: str) -> str:
+        client = get_async_groq_client()
+        completion = await client.chat.completions.create(
+            messages=[
+                {"role": "system", "content": self.system_prompt},
+                {"role": "user", "content": prompt},
+            ],
+            model=GROQ_MODEL,
+            temperature=self.temperature,
+        )
+        return _extract_choice_content(completion)
+
+    async def _complete_batch(self, prompts: List[str]) -> List[str]:
+        n = len(prompts)
+        batch_prompt = (
+            f"You will receive {n} independent requests. Answer each one separately and completely."
+            "\nFormat your reply exactly as:"
+            "\n### Row 1\n<answer to request 1>\n### Row 2\n<answer to request 2>\n..."
+            "\nDo not write anything before '### Row 1' and do not mix information between requests.\n\n"
+            + "\n\n".join(f"### Request {i}\n{p}" for i, p in enumerate(prompts, start=1))
+        )
+        reply = await self._complete(batch_prompt)
+
+        # re.split with one group yields [preamble, idx1, text1, idx2, text2, ...]
+        parts = _BATCH_ROW_RE.split(reply)
+        rows: Dict[int, str] = {}
+        for idx, text in zip(parts[1::2], parts[2::2]):
+            rows[int(idx)] = text.strip()
+        if sorted(rows) == list(range(1, n + 1)) and all(rows.values()):
+            return [rows[i] for i in range(1, n + 1)]
+
+        logger.warning("Batched completion could not be split into %s rows; falling back to per-prompt calls", n)
+        return list(await asyncio.gather(*(self._complete(p) for p in prompts)))
+
+
+_icebreaker_batcher = _CompletionBatcher(
+    system_prompt=_ICEBREAKER_SYSTEM_PROMPT,
+    temperature=0.3,
+    max_size=GROQ_BATCH_MAX_SIZE,
+    window_ms=GROQ_BATCH_WINDOW_MS,
+)
+
+
+# ------------------ Groq Batch API (bulk/offline jobs) ------------------
+
+_pending_batch_jobs: List[Dict[str, Any]] = []
+_batch_flush_task: Optional[asyncio.Task] = None
+# Flush/poll tasks; referenced here so they aren't garbage collected
+_batch_tasks: Set[asyncio.Task] = set()
+
+
+def _spawn_batch_task(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _batch_tasks.add(task)
+    task.add_done_callback(_batch_tasks.discard)
+    return task
+
+
+def _batch_request_line(job: Dict[str, Any]) -> Dict[str, Any]:
+    """Build one JSONL line of the Batch API input file for a queued job."""
+    if job["kind"] == "transcript":
+        system, prompt = _TRANSCRIPT_SYSTEM_PROMPT, _transcript_prompt(_transcript_fields(job["payload"]))
+    else:
+        payload = job["payload"]
+        system = _ICEBREAKER_SYSTEM_PROMPT
+        prompt = _icebreaker_prompt(payload.get("linkedinBio", ""), payload.get("deckText", ""))
+    return {
+        "custom_id": job["id"],
+        "method": "POST",
+        "url": "/v1/chat/completions",
+        "body": {
+            "model": GROQ_MODEL,
+            "messages": [
+                {"role": "system", "content": system},
+                {"role": "user", "content": prompt},
+            ],
+            "temperature": 0.3,
+        },
+    }
+
+
+def enqueue_batch_job(kind: str, payload: Dict[str, Any]) -> str:
+    """
+    Queue a transcript or icebreaker job for submission through the Groq Batch API.
+    
+    Jobs are collected in-process and submitted as one batch when
+    GROQ_BATCH_API_MAX_JOBS accumulate or GROQ_BATCH_API_FLUSH_SECONDS pass.
+    Batch jobs are cheaper and not subject to the chat RPM limit, but complete
+    asynchronously (minutes to hours); results land in Supabase like any other job.
+    
+    Args:
+        kind: "transcript" or "icebreaker"
+        payload: Same payload the streaming path would receive
+    
+    Returns:
+        Job identifier (also used as the batch request custom_id)
+    """
+    global _batch_flush_task
+    job_id = f"batch-{kind}-{uuid.uuid4().hex}"
+    _pending_batch_jobs.append({"id": job_id, "kind": kind, "payload": payload})
+
+    if len(_pending_batch_jobs) >= GROQ_BATCH_API_MAX_JOBS:
+        _spawn_batch_task(_flush_batch_jobs())
+    elif _batch_flush_task is None or _batch_flush_task.done():
+        _batch_flush_task = _spawn_batch_task(_flush_batch_jobs_later())
+    return job_id
+
+
+async def _flush_batch_jobs_later() -> None:
+    await asyncio.sleep(GROQ_BATCH_API_FLUSH_SECONDS)
+    await _flush_batch_jobs()
+
+
+async def _flush_batch_jobs() -> None:
+    jobs = _pending_batch_jobs[:]
+    _pending_batch_jobs.clear()
+    if not jobs:
+        return
+    try:
+        await submit_batch_groq(jobs)
+    except Exception as e:
+        logger.warning("Groq batch submission failed for %s job(s): %s. Falling back to direct calls", len(jobs), e)
+        await _run_jobs_directly(jobs)
+
+
+async def submit_batch_groq(jobs: List[Dict[str, Any]]) -> str:
+    """
+    Upload jobs as a JSONL file and create a Groq batch, then poll it in the background.
+    
+    Args:
+        jobs: Queued jobs ({"id", "kind", "payload"}) as built by enqueue_batch_job
+    
+    Returns:
+        Groq batch id
+    """
+    client = get_async_groq_client()
+    jsonl = "\n".join(json.dumps(_batch_request_line(job)) for job in jobs).encode("utf-8")
+    input_file = await client.files.create(file=("batch.jsonl", jsonl), purpose="batch")
+    batch = await client.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h",
+    )
+    logger.info("Submitted Groq batch %s with %s job(s)", batch.id, len(jobs))
+    _spawn_batch_task(_poll_batch(batch.id, jobs))
+    return batch.id
+
+
+async def _poll_batch(batch_id: str, jobs: List[Dict[str, Any]]) -> None:
+    """Wait for a batch to finish, then complete its jobs; fall back to direct calls on failure/timeout."""
+    client = get_async_groq_client()
+    loop = asyncio.get_running_loop()
+    deadline = loop.time() + GROQ_BATCH_API_TIMEOUT_MINUTES * 60
+
+    while True:
+        try:
+            batch = await client.batches.retrieve(batch_id)
+        except Exception as e:
+            logger.warning("Could not poll Groq batch %s: %s", batch_id, e)
+            batch = None
+
+        status = getattr(batch, "status", None)
+        if status == "completed":
+            break
+        if status in ("failed", "expired", "cancelled"):
+            logger.warning("Groq batch %s ended with status %s; falling back to direct calls", batch_id, status)
+            await _run_jobs_directly(jobs)
+            return
+        if loop.time() >= deadline:
+            logger.warning("Groq batch %s timed out; cancelling and falling back to direct calls", batch_id)
+            try:
+                await client.batches.cancel(batch_id)
+            except Exception:
+                pass
+            await _run_jobs_directly(jobs)
+            return
+        await asyncio.sleep(GROQ_BATCH_API_POLL_SECONDS)
+
+    results: Dict[str, str] = {}
+    if batch.output_file_id:
+        output = await client.files.content(batch.output_file_id)
+        for line in output.text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+                if row.get("error") or (row.get("response") or {}).get("status_code", 200) >= 400:
+                    continue
+                results[row["custom_id"]] = _extract_choice_content(row["response"]["body"])
+            except Exception as e:
+                logger.warning("Skipping unreadable batch output line: %s", e)
+
+    missing = [job for job in jobs if job["id"] not in results]
+    for job in jobs:
+        if job["id"] in results:
+            await _complete_batch_job(job, results[job["id"]])
+    if missing:
+        logger.warning("%s job(s) in batch %s had no result; running them directly", len(missing), batch_id)
+        await _run_jobs_directly(missing)
+
+
+async def _complete_batch_job(job: Dict[str, Any], content: str) -> None:
+    """Persist a batch result the same way the streaming path does."""
+    try:
+        if job["kind"] == "transcript":
+            fields = _transcript_fields(job["payload"])
+            input_payload = _transcript_log_input(fields)
+            # Same row shape as process_transcript: the stored text is referenced by hash
+            if supabase_logger.TRANSCRIPT_STORE_READY and fields["transcript"]:
+                transcript_hash = _transcript_hash(fields["transcript"])
+                if await store_transcript(transcript_hash, fields["transcript"]):
+                    del input_payload["transcript"]
+                    input_payload["transcript_hash"] = transcript_hash
+            queued = enqueue_interaction(
+                route="/api/v1/analyze-transcript",
+                input_payload=input_payload,
+                output_payload={"type": "transcript", "result": content, "cached": False},
+                model=GROQ_MODEL,
+                extra={"company": fields["company"], "name": fields["name"]},
+                idempotency_key=job["id"],
+            )
+        else:
+            payload = job["payload"]
+            queued = enqueue_interaction(
+                route="/api/v1/generate-icebreaker",
+                input_payload={"linkedinBio": payload.get("linkedinBio", ""), "deckText": payload.get("deckText", "")},
+                output_payload={"type": "Icebreaker", "result": _clean_icebreaker(content)},
+                model=GROQ_MODEL,
+                idempotency_key=job["id"],
+            )
+        if not queued:
+            raise RuntimeError("log queue is full")
+        logger.info("Batch job completed: %s", job["id"])
+    except Exception as e:
+        logger.exception("Could not store result for batch job %s: %s", job["id"], e)
+
+
+async def _run_jobs_directly(jobs: List[Dict[str, Any]]) -> None:
+    for job in jobs:
+        process = process_transcript if job["kind"] == "transcript" else process_icebreaker
+        try:
+            await process(job["payload"], job_key=job["id"])
+        except Exception as e:
+            logger.exception("Direct fallback failed for batch job %s: %s", job["id"], e)
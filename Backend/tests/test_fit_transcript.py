@@ -0,0 +1,45 @@
+import pytest
+
+from src.services import tasks
+
+
+@pytest.fixture
+def cap(monkeypatch):
+    def set_cap(value):
+        monkeypatch.setattr(tasks, "MAX_PROMPT_CHARS", value)
+    return set_cap
+
+
+def test_short_transcript_is_unchanged(cap):
+    cap(100)
+    text = "um, so we agreed on the pilot"
+    assert tasks._fit_transcript(text) == text
+
+
+def test_cap_zero_disables_fitting(cap):
+    cap(0)
+    text = "x" * 10_000
+    assert tasks._fit_transcript(text) == text
+
+
+def test_only_standalone_fillers_are_dropped(cap):
+    cap(40)
+    text = "Um, the umbrella deal, uh-oh, uhh is done um\nyes"
+    assert tasks._fit_transcript(text) == "the umbrella deal, uh-oh, is done \nyes"
+
+
+def test_long_transcript_keeps_head_and_tail(cap):
+    cap(200)
+    text = "START " + "a" * 1000 + " END"
+    result = tasks._fit_transcript(text)
+    assert len(result) <= 200
+    assert result.startswith("START")
+    assert result.endswith(" END")
+    assert "characters omitted" in result
+
+
+@pytest.mark.parametrize("limit", [1, 5, 20, 35, 36, 40, 50, 100, 1000])
+def test_result_never_exceeds_cap(cap, limit):
+    cap(limit)
+    for length in (limit + 1, limit * 3, 100_000):
+        assert len(tasks._fit_transcript("b" * length)) <= limit
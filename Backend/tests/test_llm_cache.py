@@ -0,0 +1,77 @@
+import asyncio
+
+import pytest
+
+from src.services import llm_cache
+
+
+@pytest.fixture(autouse=True)
+def local_cache(monkeypatch):
+    monkeypatch.setattr(llm_cache, "_redis", None)
+    monkeypatch.setattr(llm_cache, "_cache", llm_cache.OrderedDict())
+    monkeypatch.setattr(llm_cache, "_inflight", {})
+
+
+def test_concurrent_identical_requests_share_one_call():
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.05)
+        return "completion"
+
+    async def main():
+        return await asyncio.gather(*[llm_cache.get_or_compute("k", compute) for _ in range(5)])
+
+    results = asyncio.run(main())
+    assert [text for text, _ in results] == ["completion"] * 5
+    # Only the caller that triggered the LLM call gets a fresh (uncached) completion
+    assert sorted(cached for _, cached in results) == [False, True, True, True, True]
+    assert calls == 1
+    assert llm_cache._inflight == {}
+
+
+def test_result_is_cached_for_later_callers():
+    calls = 0
+
+    async def compute():
+        nonlocal calls
+        calls += 1
+        return "completion"
+
+    async def main():
+        first = await llm_cache.get_or_compute("k", compute)
+        return first, await llm_cache.get_or_compute("k", compute)
+
+    assert asyncio.run(main()) == (("completion", False), ("completion", True))
+    assert calls == 1
+
+
+def test_errors_reach_every_waiter_and_are_not_cached():
+    async def boom():
+        await asyncio.sleep(0.01)
+        raise ValueError("llm down")
+
+    async def main():
+        return await asyncio.gather(*[llm_cache.get_or_compute("k", boom) for _ in range(3)], return_exceptions=True)
+
+    results = asyncio.run(main())
+    assert all(isinstance(r, ValueError) for r in results)
+    assert llm_cache._inflight == {}
+    assert asyncio.run(llm_cache.get_cached("k")) is None
+
+
+def test_cancelled_caller_does_not_cancel_shared_work():
+    async def compute():
+        await asyncio.sleep(0.05)
+        return "completion"
+
+    async def main():
+        first = asyncio.ensure_future(llm_cache.get_or_compute("k", compute))
+        second = asyncio.ensure_future(llm_cache.get_or_compute("k", compute))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        return await second
+
+    assert asyncio.run(main()) == ("completion", True)
@@ -0,0 +1,66 @@
+import asyncio
+import json
+
+import httpx
+import pytest
+
+from src.services import supabase_logger
+
+
+@pytest.fixture
+def supabase(monkeypatch):
+    """Point the log writer at a mock Supabase; returns the list of insert bodies it received."""
+    bodies = []
+
+    def handler(request):
+        body = json.loads(request.content)
+        bodies.append(body)
+        rows = body if isinstance(body, list) else [body]
+        if any(row["input"].get("bad") for row in rows):
+            return httpx.Response(400, text="invalid input syntax")
+        return httpx.Response(201)
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(supabase_logger, "SUPABASE_READY", True)
+    monkeypatch.setattr(supabase_logger, "_ENDPOINT", "https://x.supabase.co/rest/v1/llm_interactions")
+    monkeypatch.setattr(supabase_logger, "_get_client", lambda: client)
+    return bodies
+
+
+def _row(i, bad=False):
+    return supabase_logger._build_row("/api/v1/generate-icebreaker", {"i": i, "bad": bad}, {"result": "ok"})
+
+
+def test_rows_are_inserted_in_one_bulk_post(supabase):
+    asyncio.run(supabase_logger._insert_rows([_row(0), _row(1), _row(2)]))
+    assert len(supabase) == 1
+    assert [row["input"]["i"] for row in supabase[0]] == [0, 1, 2]
+
+
+def test_poison_row_is_split_out_of_the_batch(supabase):
+    asyncio.run(supabase_logger._insert_rows([_row(0), _row(1, bad=True), _row(2)]))
+    # One rejected bulk insert, then one POST per row
+    assert len(supabase) == 4
+    assert isinstance(supabase[0], list)
+    assert [body["input"]["i"] for body in supabase[1:]] == [0, 1, 2]
+
+
+def test_rows_with_different_columns_go_in_separate_posts(supabase):
+    extra = supabase_logger._build_row("/r", {"i": 9, "bad": False}, {}, extra={"company": "Acme"})
+    asyncio.run(supabase_logger._insert_rows([_row(0), extra]))
+    assert len(supabase) == 2
+
+
+def test_rate_limited_batch_is_not_split(monkeypatch, supabase):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(429, headers={"retry-after": "0"})
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(supabase_logger, "_get_client", lambda: client)
+    monkeypatch.setattr(supabase_logger, "backoff_delay", lambda *args: 0)
+
+    asyncio.run(supabase_logger._insert_rows([_row(0), _row(1)]))
+    assert len(calls) == supabase_logger.LOG_INSERT_ATTEMPTS
@@ -0,0 +1,103 @@
+import asyncio
+import base64
+import json
+
+import httpx
+import pytest
+
+from src.services import supabase_logger
+
+ROW_B = "9f1c2d3e-4b5a-4c6d-8e7f-0a1b2c3d4e5f"
+ROW_C = "0b7e4f6a-1c2d-4e3f-9a8b-7c6d5e4f3a2b"
+
+
+def _raw_cursor(text):
+    return base64.urlsafe_b64encode(text.encode("utf-8")).decode("ascii").rstrip("=")
+
+
+def test_cursor_round_trips_created_at_and_id():
+    cursor = supabase_logger.encode_cursor("2025-01-01T00:00:00.123+00:00", 42)
+    assert "+" not in cursor and "," not in cursor
+    assert supabase_logger.decode_cursor(cursor) == ("2025-01-01T00:00:00.123+00:00", "42")
+
+
+@pytest.mark.parametrize("cursor", ["", "Zm9v", "not a cursor!", "LDQy"])
+def test_malformed_cursor_is_rejected(cursor):
+    with pytest.raises(ValueError):
+        supabase_logger.decode_cursor(cursor)
+
+
+@pytest.mark.parametrize(
+    "raw",
+    [
+        '2025-01-01T00:00:00+00:00",id.gt."0,' + ROW_B,
+        "2025-01-01T00:00:00+00:00)," + ROW_B,
+        '2025-01-01T00:00:00+00:00,b")',
+        "2025-01-01T00:00:00+00:00,1),route.eq.(x",
+        "yesterday," + ROW_B,
+    ],
+)
+def test_cursor_values_that_could_alter_the_filter_are_rejected(raw):
+    with pytest.raises(ValueError):
+        supabase_logger.decode_cursor(_raw_cursor(raw))
+
+
+def test_next_cursor_only_on_full_pages():
+    rows = [
+        {"id": ROW_C, "created_at": "2025-01-02T00:00:00+00:00"},
+        {"id": ROW_B, "created_at": "2025-01-01T00:00:00+00:00"},
+    ]
+    assert supabase_logger.next_cursor(rows, 3) is None
+    assert supabase_logger.next_cursor([], 0) is None
+    cursor = supabase_logger.next_cursor(rows, 2)
+    assert supabase_logger.decode_cursor(cursor) == ("2025-01-01T00:00:00+00:00", ROW_B)
+
+
+def test_paginate_uses_compound_keyset():
+    params = {}
+    supabase_logger._paginate(params, 40, supabase_logger.encode_cursor("2025-01-01T00:00:00+00:00", ROW_B))
+    assert "offset" not in params
+    assert params["or"] == (
+        '(created_at.lt."2025-01-01T00:00:00+00:00",'
+        'and(created_at.eq."2025-01-01T00:00:00+00:00",id.lt."' + ROW_B + '"))'
+    )
+
+
+def test_paginate_falls_back_to_offset():
+    params = {}
+    supabase_logger._paginate(params, -5, None)
+    assert params == {"offset": "0"}
+
+
+def test_fetch_sends_keyset_params(monkeypatch):
+    seen = []
+
+    def handler(request):
+        seen.append(dict(request.url.params))
+        return httpx.Response(200, content=json.dumps([{"id": ROW_C, "created_at": "2024-12-31T00:00:00+00:00"}]))
+
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(supabase_logger, "SUPABASE_READY", True)
+    monkeypatch.setattr(supabase_logger, "_ENDPOINT", "https://x.supabase.co/rest/v1/llm_interactions")
+    monkeypatch.setattr(supabase_logger, "_get_client", lambda: client)
+
+    cursor = supabase_logger.encode_cursor("2025-01-01T00:00:00+00:00", ROW_B)
+    rows = asyncio.run(supabase_logger.fetch_interactions_multi(["/a", "/b"], limit=1, before=cursor))
+
+    assert rows == [{"id": ROW_C, "created_at": "2024-12-31T00:00:00+00:00"}]
+    assert seen[0]["order"] == "created_at.desc,id.desc"
+    assert seen[0]["route"] == 'in.("/a","/b")'
+    assert f'id.lt."{ROW_B}"' in seen[0]["or"]
+    assert "offset" not in seen[0]
+
+
+def test_list_endpoint_answers_a_forged_cursor_with_400(monkeypatch):
+    from fastapi import HTTPException
+
+    from src.api.controllers import transcript_controller
+
+    monkeypatch.setattr(supabase_logger, "SUPABASE_READY", True)
+    forged = _raw_cursor('2025-01-01T00:00:00+00:00",id.gt."0,' + ROW_B)
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(transcript_controller.list_transcripts_controller(before=forged))
+    assert exc.value.status_code == 400
@@ -0,0 +1,62 @@
+import io
+import tempfile
+
+import pytest
+from fastapi import HTTPException
+
+from src.api.controllers import icebreaker_controller as ic
+
+fitz = pytest.importorskip("pymupdf")
+
+
+def _make_pdf(*pages):
+    doc = fitz.open()
+    for text in pages:
+        page = doc.new_page()
+        if text:
+            page.insert_text((72, 72), text)
+    data = doc.tobytes()
+    doc.close()
+    return data
+
+
+def _spooled(data, max_size):
+    spool = tempfile.SpooledTemporaryFile(max_size=max_size)
+    spool.write(data)
+    spool.seek(0)
+    return spool
+
+
+def test_extracts_text_per_slide_and_skips_empty_pages():
+    data = _make_pdf("Problem: churn", "", "Solution: SherpaAI")
+    assert ic._extract_pdf_text(io.BytesIO(data)) == (
+        "--- Slide 1 ---\nProblem: churn\n\n--- Slide 3 ---\nSolution: SherpaAI"
+    )
+
+
+@pytest.mark.parametrize("max_size", [1024 * 1024, 16])
+def test_extracts_from_in_memory_and_rolled_spools(max_size):
+    data = _make_pdf("Traction: 40 customers")
+    with _spooled(data, max_size) as spool:
+        assert ic._extract_pdf_text(spool) == "--- Slide 1 ---\nTraction: 40 customers"
+
+
+def test_pypdf_fallback_extracts_the_same_text(monkeypatch):
+    pypdf = pytest.importorskip("pypdf")
+    monkeypatch.setattr(ic, "_pdf_libs", lambda: (None, pypdf.PdfReader))
+    assert ic._extract_pdf_text(io.BytesIO(_make_pdf("Ask: $2M seed"))) == "--- Slide 1 ---\nAsk: $2M seed"
+
+
+def test_deck_without_text_is_rejected():
+    with pytest.raises(HTTPException) as exc:
+        ic._extract_pdf_text(io.BytesIO(_make_pdf("")))
+    assert exc.value.status_code == 422
+
+
+def test_non_pdf_upload_is_rejected():
+    junk = io.BytesIO(b"PK\x03\x04 this is a zip, not a deck")
+    assert not ic._has_pdf_header(junk)
+    assert ic._has_pdf_header(io.BytesIO(_make_pdf("Hello")))
+    with pytest.raises(HTTPException) as exc:
+        ic._extract_pdf_text(junk)
+    assert exc.value.status_code == 400
@@ -0,0 +1,96 @@
+import json
+import types
+
+import httpx
+import pytest
+from starlette.datastructures import Headers
+
+from src.services import qstash_client
+
+URL = "https://api.example.com/api/v1/icebreakers/callback"
+BODY = {"linkedinBio": "Founder at Acme. " * 50, "deckText": "Pitch"}
+
+
+class _Delivery:
+    """What the callback receives: the published bytes plus the forwarded headers."""
+
+    def __init__(self):
+        self.body = None
+        self.headers = {}
+
+    def request(self):
+        return types.SimpleNamespace(headers=Headers(self.headers))
+
+
+def _message_client(delivery):
+    def publish(url, body, content_type, headers=None):
+        delivery.body, delivery.headers = body, dict(headers or {})
+        return {"messageId": "m1"}
+    return types.SimpleNamespace(message=types.SimpleNamespace(publish=publish))
+
+
+def _message_json_client(delivery):
+    def publish_json(url, body):
+        delivery.body = json.dumps(body).encode()
+        return {"messageId": "m1"}
+    return types.SimpleNamespace(message=types.SimpleNamespace(publish_json=publish_json))
+
+
+def _json_client(delivery):
+    def publish_json(url, body):
+        delivery.body = json.dumps(body).encode()
+        return {"messageId": "m1"}
+    return types.SimpleNamespace(publish_json=publish_json)
+
+
+def _generic_client(delivery):
+    def publish(url, body, content_type, headers=None):
+        delivery.body, delivery.headers = body, dict(headers or {})
+        return {"messageId": "m1"}
+    return types.SimpleNamespace(publish=publish)
+
+
+def _old_generic_client(delivery):
+    # Older SDKs: no content_type/headers keywords, so nothing can be forwarded
+    def publish(url, body):
+        delivery.body = body
+        return {"messageId": "m1"}
+    return types.SimpleNamespace(publish=publish)
+
+
+def _http_client(delivery, monkeypatch):
+    def post(path, headers, content):
+        delivery.body = content
+        prefix = "Upstash-Forward-"
+        delivery.headers = {
+            k[len(prefix):]: v for k, v in headers.items() if k.startswith(prefix) and k != prefix + "Url"
+        }
+        return httpx.Response(200, json={"messageId": "m1"})
+
+    monkeypatch.setattr(qstash_client, "_QSTASH_TOKEN", "token")
+    monkeypatch.setattr(qstash_client, "_publish_http_client", lambda token: types.SimpleNamespace(post=post))
+    return types.SimpleNamespace()
+
+
+@pytest.mark.parametrize("gzip_min_bytes", [0, 1])
+@pytest.mark.parametrize(
+    "make_client",
+    [_message_client, _message_json_client, _json_client, _generic_client, _old_generic_client, "http"],
+)
+def test_every_publisher_delivers_a_decodable_body(monkeypatch, make_client, gzip_min_bytes):
+    monkeypatch.setattr(qstash_client, "QSTASH_GZIP_MIN_BYTES", gzip_min_bytes)
+    delivery = _Delivery()
+    client = _http_client(delivery, monkeypatch) if make_client == "http" else make_client(delivery)
+
+    result = qstash_client.qstash_publish_json(client, URL, BODY)
+
+    assert result["messageId"] == "m1"
+    assert qstash_client.decode_qstash_body(delivery.request(), delivery.body) == BODY
+
+
+def test_gzipped_publish_forwards_content_encoding(monkeypatch):
+    monkeypatch.setattr(qstash_client, "QSTASH_GZIP_MIN_BYTES", 1)
+    delivery = _Delivery()
+    qstash_client.qstash_publish_json(_generic_client(delivery), URL, BODY)
+    assert delivery.headers == {"Content-Encoding": "gzip"}
+    assert delivery.body[:2] == b"\x1f\x8b"
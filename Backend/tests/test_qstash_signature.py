@@ -0,0 +1,64 @@
+import base64
+import hashlib
+import time
+
+import jwt
+import pytest
+
+from src.services import qstash_client
+
+URL = "https://api.example.com/api/v1/transcripts/callback"
+BODY = b'{"transcript":"hello"}'
+
+
+@pytest.fixture(autouse=True)
+def signing_keys(monkeypatch):
+    monkeypatch.setattr(qstash_client, "_CURRENT_SIGNING_KEY", "sig_current")
+    monkeypatch.setattr(qstash_client, "_NEXT_SIGNING_KEY", "sig_next")
+
+
+def _sign(body=BODY, url=URL, key="sig_current", algorithm="HS256", **claims):
+    now = int(time.time())
+    payload = {
+        "iss": "Upstash",
+        "sub": url,
+        "exp": now + 300,
+        "nbf": now - 5,
+        "body": base64.urlsafe_b64encode(hashlib.sha256(body).digest()).decode("ascii").rstrip("="),
+    }
+    payload.update(claims)
+    return jwt.encode(payload, key, algorithm=algorithm)
+
+
+def test_valid_signature_with_current_or_next_key():
+    assert qstash_client._check_signature(_sign(), BODY, URL) is None
+    assert qstash_client._check_signature(_sign(key="sig_next"), BODY, URL) is None
+
+
+def test_wrong_key_is_rejected():
+    assert qstash_client._check_signature(_sign(key="other"), BODY, URL) == "signature does not match the signing keys"
+
+
+def test_tampered_body_is_rejected():
+    assert qstash_client._check_signature(_sign(), BODY + b" ", URL) == "invalid body hash"
+
+
+def test_other_url_is_rejected():
+    assert qstash_client._check_signature(_sign(url="https://evil.example.com/cb"), BODY, URL).startswith(
+        "invalid subject"
+    )
+
+
+def test_expired_and_not_yet_valid_are_rejected():
+    now = int(time.time())
+    assert qstash_client._check_signature(_sign(exp=now - 1), BODY, URL) == "signature has expired"
+    assert qstash_client._check_signature(_sign(nbf=now + 60), BODY, URL) == "signature is not yet valid"
+
+
+def test_wrong_issuer_is_rejected():
+    assert qstash_client._check_signature(_sign(iss="someone"), BODY, URL) == "invalid issuer"
+
+
+def test_non_hs256_tokens_are_left_to_the_sdk():
+    assert qstash_client._check_signature(_sign(algorithm="HS512"), BODY, URL) == qstash_client._UNSUPPORTED
+    assert qstash_client._check_signature("not-a-jwt", BODY, URL) == qstash_client._UNSUPPORTED
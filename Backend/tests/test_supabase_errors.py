@@ -0,0 +1,87 @@
+import asyncio
+
+import httpx
+import pytest
+
+from src.services import supabase_logger
+
+
+def _use_transport(monkeypatch, handler):
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    monkeypatch.setattr(supabase_logger, "SUPABASE_READY", True)
+    monkeypatch.setattr(supabase_logger, "_ENDPOINT", "https://x.supabase.co/rest/v1/llm_interactions")
+    monkeypatch.setattr(supabase_logger, "_get_client", lambda: client)
+
+
+def _request():
+    return asyncio.run(supabase_logger._request("GET", supabase_logger._ENDPOINT, "fetch"))
+
+
+def test_timeout_is_raised_as_supabase_timeout_with_its_cause(monkeypatch):
+    def handler(request):
+        raise httpx.ReadTimeout("slow", request=request)
+
+    _use_transport(monkeypatch, handler)
+    with pytest.raises(supabase_logger.SupabaseTimeout) as exc:
+        _request()
+    assert isinstance(exc.value.__cause__, httpx.ReadTimeout)
+
+
+def test_transport_error_is_raised_as_supabase_error_with_its_cause(monkeypatch):
+    def handler(request):
+        raise httpx.ConnectError("refused", request=request)
+
+    _use_transport(monkeypatch, handler)
+    with pytest.raises(supabase_logger.SupabaseError) as exc:
+        _request()
+    assert exc.value.status_code is None
+    assert isinstance(exc.value.__cause__, httpx.ConnectError)
+
+
+def test_429_is_raised_as_rate_limited_with_retry_after(monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(429, headers={"retry-after": "7"}))
+    with pytest.raises(supabase_logger.SupabaseRateLimited) as exc:
+        _request()
+    assert exc.value.status_code == 429
+    assert exc.value.retry_after == 7.0
+
+
+def test_error_status_carries_the_status_code(monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(409, text="duplicate key"))
+    with pytest.raises(supabase_logger.SupabaseError) as exc:
+        _request()
+    assert exc.value.status_code == 409
+    assert "duplicate key" in str(exc.value)
+
+
+def test_insert_retry_waits_for_retry_after(monkeypatch):
+    responses = [httpx.Response(429, headers={"retry-after": "3"}), httpx.Response(201)]
+    _use_transport(monkeypatch, lambda request: responses.pop(0))
+    delays = []
+
+    async def fake_sleep(delay):
+        delays.append(delay)
+
+    monkeypatch.setattr(supabase_logger.asyncio, "sleep", fake_sleep)
+    asyncio.run(supabase_logger._post_insert({"route": "/r"}))
+    assert len(delays) == 1 and 3.0 <= delays[0] <= 3.5
+
+
+def test_insert_does_not_retry_a_rejected_row(monkeypatch):
+    calls = []
+
+    def handler(request):
+        calls.append(request)
+        return httpx.Response(400, text="invalid input syntax")
+
+    _use_transport(monkeypatch, handler)
+    with pytest.raises(supabase_logger.SupabaseError) as exc:
+        asyncio.run(supabase_logger._post_insert({"route": "/r"}))
+    assert exc.value.status_code == 400
+    assert len(calls) == 1
+
+
+def test_best_effort_reads_turn_supabase_errors_into_empty_results(monkeypatch):
+    _use_transport(monkeypatch, lambda request: httpx.Response(503))
+    assert asyncio.run(supabase_logger.fetch_interactions("/r")) == []
+    assert asyncio.run(supabase_logger.delete_interactions_by_ids(["a"])) == 0
@@ -125,14 +125,31 @@ export default function IcebreakerPage() {
         }
         
         await res.json();
-        
-        // Refresh feed
-        const list = await listFeed();
-        setItems(list);
-        setShowShimmer(false);
-        setLoading(false);
-        addToast({ title: "Icebreaker created successfully!", variant: "success" });
-        setForm({ person: "", role: "", company: "", linkedinBio: "", deckText: "", pitchDeck: "", file: null });
+
+        // The backend saves the result to the feed just after responding, so poll until it shows up
+        pollingRef.current = true;
+        const pdfMatcher = (it) =>
+          it?.route === "/api/v1/generate-icebreaker-from-pdf" &&
+          (it?.input?.linkedinBio || "").trim() === (form.linkedinBio || "").trim();
+
+        await pollFeedForNewItem(
+          baselineTopId,
+          pdfMatcher,
+          async (newItems) => {
+            pollingRef.current = false;
+            setItems(newItems);
+            setShowShimmer(false);
+            setLoading(false);
+            addToast({ title: "Icebreaker created successfully!", variant: "success" });
+            setForm({ person: "", role: "", company: "", linkedinBio: "", deckText: "", pitchDeck: "", file: null });
+          },
+          (err) => {
+            pollingRef.current = false;
+            setShowShimmer(false);
+            setLoading(false);
+            addToast({ title: "Icebreaker created", description: "It may take a moment to appear in the feed.", variant: "warning" });
+          }
+        );
       } else {
         // Non-PDF: Use new job-based endpoint
         const url = `${BACKEND_URL}/api/v1/icebreakers/jobs`;